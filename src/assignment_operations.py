@@ -2,15 +2,153 @@
 Assignment operations service for handling task state transitions.
 """
 import logging
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
 
-from sqlalchemy.orm import Session
-from .database import get_db_session
-from .models import Assignment, AssignmentStatus, User, ApprovalRequest, ApprovalType, ApprovalStatus, log_action
+from cachetools import TTLCache
+from sqlalchemy import String, bindparam, cast, func, insert, literal, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db_session
+from .models import Assignment, AssignmentStatus, TaskTemplate, User, ApprovalRequest, ApprovalType, ApprovalStatus, PENDING_APPROVAL_WHERE, AuditLog, INSTRUCTIONS_PREVIEW_LENGTH, audit_values, next_hour_boundary, utcnow
 
 logger = logging.getLogger(__name__)
 
+# Statuses in which a task counts as being worked on
+ACTIVE_STATUSES = (AssignmentStatus.ACTIVE, AssignmentStatus.COVERING)
+
+# Assignment owners never change, so ownership checks from button presses are served
+# from memory; the TTL only bounds how long entries for finished tasks linger.
+# Shared across instances because views build a new AssignmentOperations per click.
+_owner_cache: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+
+# Human-readable status names for user-facing messages
+_STATUS_DISPLAY: Dict[AssignmentStatus, str] = {
+    status: status.value.replace('_', ' ') for status in AssignmentStatus
+}
+
+
+def _duration_minutes(started_at: Optional[datetime], ended_at: datetime) -> Optional[int]:
+    """Whole minutes between a stored start time and an aware end time"""
+    if not started_at:
+        return None
+    # SQLite hands back naive datetimes; they are stored as UTC
+    started_at = started_at.replace(tzinfo=started_at.tzinfo or timezone.utc)
+    return int((ended_at - started_at).total_seconds() / 60)
+
+
+# Dialect INSERT constructs that support ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+@dataclass(frozen=True)
+class AssignmentDetails:
+    """Read-only snapshot of an assignment for views and widgets"""
+    id: int
+    user_id: str
+    status: AssignmentStatus
+    task_name: str
+    hour_index: int
+    params: Optional[Dict[str, Any]]
+    started_at: Optional[datetime]
+    ends_at: Optional[datetime]
+    ended_at: Optional[datetime]
+    instructions: Optional[str]
+
+
+# Hot-path statements are built once at import and re-executed with bound parameters
+_DETAILS_COLUMNS = [
+    getattr(Assignment, field.name) for field in fields(AssignmentDetails) if field.name != "instructions"
+]
+
+# One character past the preview is enough to know whether it was cut
+_INSTRUCTIONS_PREVIEW = func.substr(TaskTemplate.instructions, 1, INSTRUCTIONS_PREVIEW_LENGTH + 1)
+
+_SELECT_DETAILS = (
+    select(*_DETAILS_COLUMNS, _INSTRUCTIONS_PREVIEW.label("instructions"))
+    .outerjoin(Assignment.template)
+    .where(Assignment.id == bindparam("aid"))
+)
+
+_SELECT_OWNER = select(Assignment.user_id).where(Assignment.id == bindparam("aid"))
+
+_SELECT_OWNER_AND_STATUS = select(Assignment.user_id, Assignment.status).where(
+    Assignment.id == bindparam("aid")
+)
+
+_SELECT_STATUSES = select(Assignment.id, Assignment.status).where(
+    Assignment.id.in_(bindparam("aids", expanding=True))
+)
+
+# Validate and transition in one statement so a concurrent click can't race us
+_START_TASK = (
+    update(Assignment)
+    .where(
+        Assignment.id == bindparam("aid"),
+        Assignment.user_id == bindparam("uid"),
+        Assignment.status == AssignmentStatus.PENDING_ACK
+    )
+    .values(
+        status=AssignmentStatus.ACTIVE,
+        # The database clock is authoritative for task timing
+        started_at=func.now(),
+        # Ensure ends_at is set to hour boundary if not already set
+        ends_at=func.coalesce(Assignment.ends_at, next_hour_boundary()),
+        version=Assignment.version + 1
+    )
+    # The post-start snapshot lets the widget refresh without reading the row back
+    .returning(
+        *_DETAILS_COLUMNS,
+        select(_INSTRUCTIONS_PREVIEW)
+        .where(TaskTemplate.id == Assignment.template_id)
+        .scalar_subquery()
+        .label("instructions")
+    )
+    .execution_options(synchronize_session=False)
+)
+
+# PostgreSQL only: the UPDATE feeds the audit INSERT through data-modifying CTEs, so a
+# start is a single statement returning the snapshot; no row means the guard matched nothing
+_started = _START_TASK.cte("started")
+_started_audit = (
+    insert(AuditLog)
+    .from_select(
+        ["action", "actor_id", "target", "data"],
+        select(
+            literal("task_started"),
+            bindparam("uid"),
+            cast(bindparam("aid"), String),
+            func.json_build_object(
+                "task_name", _started.c.task_name,
+                "hour_index", _started.c.hour_index,
+                "started_at", _started.c.started_at
+            )
+        ).select_from(_started)
+    )
+    .returning(AuditLog.id)
+    .cte("started_audit")
+)
+_START_TASK_AUDITED = select(_started).add_cte(_started_audit)
+
+_COMPLETE_TASK = (
+    update(Assignment)
+    .where(
+        Assignment.id == bindparam("aid"),
+        Assignment.user_id == bindparam("uid"),
+        Assignment.status.in_(ACTIVE_STATUSES)
+    )
+    .values(
+        status=AssignmentStatus.COMPLETED,
+        ended_at=bindparam("now"),
+        version=Assignment.version + 1
+    )
+    .returning(Assignment.task_name, Assignment.hour_index, Assignment.started_at)
+    .execution_options(synchronize_session=False)
+)
 
 class AssignmentOperations:
     """Service for handling assignment state transitions and operations"""
@@ -18,7 +156,11 @@ class AssignmentOperations:
     def __init__(self, bot):
         self.bot = bot
         
-    async def start_task(self, assignment_id: int, user_id: str) -> Tuple[bool, str]:
+    async def start_task(
+        self,
+        assignment_id: int,
+        user_id: str
+    ) -> Tuple[bool, str, Optional[AssignmentDetails]]:
         """
         Start a task by transitioning from PENDING_ACK to ACTIVE.
         
@@ -27,53 +169,49 @@ class AssignmentOperations:
             user_id: ID of the user starting the task (for validation)
             
         Returns:
-            (success, message) tuple
+            (success, message, details) tuple; details is the started assignment, or None on failure
         """
         try:
-            with get_db_session() as db:
-                # Get the assignment
-                assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-                if not assignment:
-                    return False, "Assignment not found"
-                
-                # Validate user ownership
-                if assignment.user_id != user_id:
-                    return False, "You can only start your own tasks"
-                
-                # Check current status
-                if assignment.status != AssignmentStatus.PENDING_ACK:
-                    return False, f"Task is already {assignment.status.value.replace('_', ' ')}"
-                
-                # Update assignment status
-                now_utc = datetime.now(timezone.utc)
-                assignment.status = AssignmentStatus.ACTIVE
-                assignment.started_at = now_utc
-                
-                # Ensure ends_at is set to hour boundary if not already set
-                if not assignment.ends_at:
-                    assignment.ends_at = now_utc.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-                
-                db.commit()
-                
-                # Log the action
-                log_action(
-                    db,
-                    action="task_started",
-                    actor_id=user_id,
-                    target=str(assignment_id),
-                    metadata={
-                        "task_name": assignment.task_name,
-                        "hour_index": assignment.hour_index,
-                        "started_at": now_utc.isoformat()
-                    }
-                )
-                
-                logger.info(f"Task started: assignment {assignment_id} by user {user_id}")
-                return True, "Task started successfully!"
+            params = {"aid": assignment_id, "uid": user_id}
+            
+            async with get_async_db_session() as db:
+                if db.bind.dialect.name == 'postgresql' and getattr(self.bot, 'audit_writer', None) is None:
+                    row = (await db.execute(_START_TASK_AUDITED, params)).first()
+                    started = row is not None
+                    if started:
+                        await db.commit()
+                else:
+                    row = (await db.execute(_START_TASK, params)).first()
+                    started = row is not None
+                    if started:
+                        # Log the action alongside the state change
+                        await self._commit_with_audit(db, [audit_values(
+                            action="task_started",
+                            actor_id=user_id,
+                            target=str(assignment_id),
+                            metadata={
+                                "task_name": row.task_name,
+                                "hour_index": row.hour_index,
+                                "started_at": row.started_at
+                            }
+                        )])
+                
+                if not started:
+                    current = await self._get_owner_and_status(db, assignment_id)
+            
+            if not started:
+                if not current:
+                    return False, "Assignment not found", None
+                if current.user_id != user_id:
+                    return False, "You can only start your own tasks", None
+                return False, f"Task is already {_STATUS_DISPLAY[current.status]}", None
+            
+            logger.info("Task started: assignment %s by user %s", assignment_id, user_id)
+            return True, "Task started successfully!", AssignmentDetails(**row._mapping)
                 
-        except Exception as e:
-            logger.error(f"Failed to start task {assignment_id}: {e}")
-            return False, "An error occurred while starting the task"
+        except Exception:
+            logger.error("Failed to start task %s", assignment_id, exc_info=True)
+            return False, "An error occurred while starting the task", None
             
     async def complete_task(self, assignment_id: int, user_id: str) -> Tuple[bool, str]:
         """
@@ -87,45 +225,193 @@ class AssignmentOperations:
             (success, message) tuple
         """
         try:
-            with get_db_session() as db:
-                assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-                if not assignment:
+            now_utc = utcnow()
+            
+            async with get_async_db_session() as db:
+                row = (await db.execute(
+                    _COMPLETE_TASK, {"aid": assignment_id, "uid": user_id, "now": now_utc}
+                )).first()
+                
+                if row is None:
+                    current = await self._get_owner_and_status(db, assignment_id)
+                else:
+                    # Log the action alongside the state change
+                    await self._commit_with_audit(db, [audit_values(
+                        action="task_completed",
+                        actor_id=user_id,
+                        target=str(assignment_id),
+                        metadata={
+                            "task_name": row.task_name,
+                            "hour_index": row.hour_index,
+                            "completed_at": now_utc,
+                            "duration_minutes": _duration_minutes(row.started_at, now_utc)
+                        }
+                    )])
+            
+            if row is None:
+                if not current:
                     return False, "Assignment not found"
-                
-                if assignment.user_id != user_id:
+                if current.user_id != user_id:
                     return False, "You can only complete your own tasks"
+                return False, f"Task is not active (current status: {_STATUS_DISPLAY[current.status]})"
+            
+            _owner_cache.pop(assignment_id, None)
+            logger.info("Task completed: assignment %s by user %s", assignment_id, user_id)
+            return True, "🎉 Task completed successfully! Great work!"
                 
-                if assignment.status not in [AssignmentStatus.ACTIVE, AssignmentStatus.COVERING]:
-                    return False, f"Task is not active (current status: {assignment.status.value})"
-                
-                # Update assignment
-                now_utc = datetime.now(timezone.utc)
-                assignment.status = AssignmentStatus.COMPLETED
-                assignment.ended_at = now_utc
-                
-                db.commit()
-                
-                # Log the action
-                log_action(
-                    db,
-                    action="task_completed",
-                    actor_id=user_id,
-                    target=str(assignment_id),
-                    metadata={
-                        "task_name": assignment.task_name,
-                        "hour_index": assignment.hour_index,
-                        "completed_at": now_utc.isoformat(),
-                        "duration_minutes": int((now_utc - assignment.started_at).total_seconds() / 60) if assignment.started_at else None
-                    }
-                )
-                
-                logger.info(f"Task completed: assignment {assignment_id} by user {user_id}")
-                return True, "🎉 Task completed successfully! Great work!"
-                
-        except Exception as e:
-            logger.error(f"Failed to complete task {assignment_id}: {e}")
+        except Exception:
+            logger.error("Failed to complete task %s", assignment_id, exc_info=True)
             return False, "An error occurred while completing the task"
             
+    async def bulk_start(self, assignment_ids: List[int], actor_id: str) -> Dict[int, Tuple[bool, str]]:
+        """
+        Start several tasks at once on behalf of their owners (admin action).
+        
+        Args:
+            assignment_ids: IDs of the assignments to start
+            actor_id: ID of the admin performing the action
+            
+        Returns:
+            Dict mapping each assignment ID to a (success, message) tuple
+        """
+        if not assignment_ids:
+            return {}
+        
+        try:
+            async with get_async_db_session() as db:
+                rows = (await db.execute(
+                    update(Assignment)
+                    .where(
+                        Assignment.id.in_(assignment_ids),
+                        Assignment.status == AssignmentStatus.PENDING_ACK
+                    )
+                    .values(
+                        status=AssignmentStatus.ACTIVE,
+                        started_at=func.now(),
+                        ends_at=func.coalesce(Assignment.ends_at, next_hour_boundary()),
+                        version=Assignment.version + 1
+                    )
+                    .returning(
+                        Assignment.id,
+                        Assignment.user_id,
+                        Assignment.task_name,
+                        Assignment.hour_index,
+                        Assignment.started_at
+                    )
+                    .execution_options(synchronize_session=False)
+                )).all()
+                
+                rejected = await self._get_statuses(db, set(assignment_ids) - {row.id for row in rows})
+                await self._commit_with_audit(db, [
+                    {
+                        "action": "task_started",
+                        "actor_id": actor_id,
+                        "target": str(row.id),
+                        "data": {
+                            "task_name": row.task_name,
+                            "hour_index": row.hour_index,
+                            "started_at": row.started_at,
+                            "owner_id": row.user_id,
+                            "bulk": True
+                        }
+                    }
+                    for row in rows
+                ])
+            
+            results = {row.id: (True, "Task started successfully!") for row in rows}
+            for assignment_id, status in rejected.items():
+                if status is None:
+                    results[assignment_id] = (False, "Assignment not found")
+                else:
+                    results[assignment_id] = (False, f"Task is already {_STATUS_DISPLAY[status]}")
+            
+            logger.info("Bulk start by %s: %s/%s tasks started", actor_id, len(rows), len(assignment_ids))
+            return results
+            
+        except Exception:
+            logger.error("Failed to bulk start tasks %s", assignment_ids, exc_info=True)
+            return {
+                assignment_id: (False, "An error occurred while starting the task")
+                for assignment_id in assignment_ids
+            }
+            
+    async def bulk_complete(self, assignment_ids: List[int], actor_id: str) -> Dict[int, Tuple[bool, str]]:
+        """
+        Complete several tasks at once, e.g. when an admin ends a shift.
+        
+        Args:
+            assignment_ids: IDs of the assignments to complete
+            actor_id: ID of the admin performing the action
+            
+        Returns:
+            Dict mapping each assignment ID to a (success, message) tuple
+        """
+        if not assignment_ids:
+            return {}
+        
+        try:
+            now_utc = utcnow()
+            
+            async with get_async_db_session() as db:
+                rows = (await db.execute(
+                    update(Assignment)
+                    .where(
+                        Assignment.id.in_(assignment_ids),
+                        Assignment.status.in_(ACTIVE_STATUSES)
+                    )
+                    .values(
+                        status=AssignmentStatus.COMPLETED,
+                        ended_at=now_utc,
+                        version=Assignment.version + 1
+                    )
+                    .returning(
+                        Assignment.id,
+                        Assignment.user_id,
+                        Assignment.task_name,
+                        Assignment.hour_index,
+                        Assignment.started_at
+                    )
+                    .execution_options(synchronize_session=False)
+                )).all()
+                
+                rejected = await self._get_statuses(db, set(assignment_ids) - {row.id for row in rows})
+                await self._commit_with_audit(db, [
+                    {
+                        "action": "task_completed",
+                        "actor_id": actor_id,
+                        "target": str(row.id),
+                        "data": {
+                            "task_name": row.task_name,
+                            "hour_index": row.hour_index,
+                            "completed_at": now_utc,
+                            "duration_minutes": _duration_minutes(row.started_at, now_utc),
+                            "owner_id": row.user_id,
+                            "bulk": True
+                        }
+                    }
+                    for row in rows
+                ])
+            
+            for row in rows:
+                _owner_cache.pop(row.id, None)
+            
+            results = {row.id: (True, "Task completed") for row in rows}
+            for assignment_id, status in rejected.items():
+                if status is None:
+                    results[assignment_id] = (False, "Assignment not found")
+                else:
+                    results[assignment_id] = (False, f"Task is not active (current status: {_STATUS_DISPLAY[status]})")
+            
+            logger.info("Bulk complete by %s: %s/%s tasks completed", actor_id, len(rows), len(assignment_ids))
+            return results
+            
+        except Exception:
+            logger.error("Failed to bulk complete tasks %s", assignment_ids, exc_info=True)
+            return {
+                assignment_id: (False, "An error occurred while completing the task")
+                for assignment_id in assignment_ids
+            }
+            
     async def request_edit(
         self, 
         assignment_id: int, 
@@ -146,63 +432,52 @@ class AssignmentOperations:
             (success, message) tuple
         """
         try:
-            with get_db_session() as db:
-                assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-                if not assignment:
-                    return False, "Assignment not found"
-                
-                if assignment.user_id != user_id:
-                    return False, "You can only edit your own tasks"
-                
-                if assignment.status not in [AssignmentStatus.ACTIVE, AssignmentStatus.COVERING]:
-                    return False, "Task must be active to request edits"
-                
-                # Check for existing pending edit requests
-                existing_request = db.query(ApprovalRequest).filter(
-                    ApprovalRequest.assignment_id == assignment_id,
-                    ApprovalRequest.type == ApprovalType.EDIT,
-                    ApprovalRequest.status == ApprovalStatus.PENDING
-                ).first()
-                
-                if existing_request:
-                    return False, "You already have a pending edit request for this task"
-                
+            async with get_async_db_session() as db:
                 # TODO: Check cooldown
                 
-                # Create approval request
-                approval_request = ApprovalRequest(
-                    user_id=user_id,
-                    assignment_id=assignment_id,
-                    type=ApprovalType.EDIT,
-                    payload={
+                # Create approval request unless one is already pending
+                request_id = await self._insert_pending_request(
+                    db,
+                    assignment_id,
+                    user_id,
+                    ApprovalType.EDIT,
+                    {
                         "proposed_changes": proposed_changes,
                         "reason": reason
                     }
                 )
                 
-                db.add(approval_request)
-                db.commit()
-                
-                # Log the action
-                log_action(
-                    db,
-                    action="edit_request_created",
-                    actor_id=user_id,
-                    target=str(assignment_id),
-                    metadata={
-                        "request_id": approval_request.id,
-                        "reason": reason,
-                        "proposed_changes": proposed_changes
-                    }
-                )
-                
-                # TODO: Send admin notification
-                
-                logger.info(f"Edit request created: assignment {assignment_id} by user {user_id}")
-                return True, "📝 Edit request submitted and sent to admins for approval"
+                if request_id is None:
+                    current = await self._get_owner_and_status(db, assignment_id)
+                else:
+                    # Log the action alongside the state change
+                    await self._commit_with_audit(db, [audit_values(
+                        action="edit_request_created",
+                        actor_id=user_id,
+                        target=str(assignment_id),
+                        metadata={
+                            "request_id": request_id,
+                            "reason": reason,
+                            "proposed_changes": proposed_changes
+                        }
+                    )])
+            
+            if request_id is None:
+                if not current:
+                    return False, "Assignment not found"
+                if current.user_id != user_id:
+                    return False, "You can only edit your own tasks"
+                if current.status not in ACTIVE_STATUSES:
+                    return False, "Task must be active to request edits"
+                return False, "You already have a pending edit request for this task"
+            
+            # TODO: Send admin notification
+            
+            logger.info("Edit request created: assignment %s by user %s", assignment_id, user_id)
+            return True, "📝 Edit request submitted and sent to admins for approval"
                 
-        except Exception as e:
-            logger.error(f"Failed to create edit request for {assignment_id}: {e}")
+        except Exception:
+            logger.error("Failed to create edit request for %s", assignment_id, exc_info=True)
             return False, "An error occurred while creating the edit request"
             
     async def request_end_early(
@@ -223,78 +498,155 @@ class AssignmentOperations:
             (success, message) tuple
         """
         try:
-            with get_db_session() as db:
-                assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-                if not assignment:
-                    return False, "Assignment not found"
-                
-                if assignment.user_id != user_id:
-                    return False, "You can only end your own tasks early"
-                
-                if assignment.status not in [AssignmentStatus.ACTIVE, AssignmentStatus.COVERING]:
-                    return False, "Task must be active to request early end"
-                
-                # Check for existing pending end early requests
-                existing_request = db.query(ApprovalRequest).filter(
-                    ApprovalRequest.assignment_id == assignment_id,
-                    ApprovalRequest.type == ApprovalType.END_EARLY,
-                    ApprovalRequest.status == ApprovalStatus.PENDING
-                ).first()
-                
-                if existing_request:
-                    return False, "You already have a pending end early request for this task"
-                
+            async with get_async_db_session() as db:
                 # TODO: Check cooldown
                 
-                # Create approval request
-                approval_request = ApprovalRequest(
-                    user_id=user_id,
-                    assignment_id=assignment_id,
-                    type=ApprovalType.END_EARLY,
-                    payload={
-                        "reason": reason
-                    }
-                )
-                
-                db.add(approval_request)
-                db.commit()
-                
-                # Log the action
-                log_action(
+                # Create approval request unless one is already pending
+                request_id = await self._insert_pending_request(
                     db,
-                    action="end_early_request_created",
-                    actor_id=user_id,
-                    target=str(assignment_id),
-                    metadata={
-                        "request_id": approval_request.id,
+                    assignment_id,
+                    user_id,
+                    ApprovalType.END_EARLY,
+                    {
                         "reason": reason
                     }
                 )
                 
-                # TODO: Send admin notification
-                
-                logger.info(f"End early request created: assignment {assignment_id} by user {user_id}")
-                return True, "⏹️ End early request submitted and sent to admins for approval"
+                if request_id is None:
+                    current = await self._get_owner_and_status(db, assignment_id)
+                else:
+                    # Log the action alongside the state change
+                    await self._commit_with_audit(db, [audit_values(
+                        action="end_early_request_created",
+                        actor_id=user_id,
+                        target=str(assignment_id),
+                        metadata={
+                            "request_id": request_id,
+                            "reason": reason
+                        }
+                    )])
+            
+            if request_id is None:
+                if not current:
+                    return False, "Assignment not found"
+                if current.user_id != user_id:
+                    return False, "You can only end your own tasks early"
+                if current.status not in ACTIVE_STATUSES:
+                    return False, "Task must be active to request early end"
+                return False, "You already have a pending end early request for this task"
+            
+            # TODO: Send admin notification
+            
+            logger.info("End early request created: assignment %s by user %s", assignment_id, user_id)
+            return True, "⏹️ End early request submitted and sent to admins for approval"
                 
-        except Exception as e:
-            logger.error(f"Failed to create end early request for {assignment_id}: {e}")
+        except Exception:
+            logger.error("Failed to create end early request for %s", assignment_id, exc_info=True)
             return False, "An error occurred while creating the end early request"
             
-    async def get_assignment_details(self, assignment_id: int) -> Optional[Assignment]:
-        """Get assignment details by ID"""
+    async def get_assignment_details(self, assignment_id: int) -> Optional[AssignmentDetails]:
+        """
+        Get assignment details by ID.
+        
+        Args:
+            assignment_id: ID of the assignment to fetch
+            
+        Returns:
+            Read-only snapshot of the assignment, or None if it does not exist
+        """
         try:
-            with get_db_session() as db:
-                return db.query(Assignment).filter(Assignment.id == assignment_id).first()
-        except Exception as e:
-            logger.error(f"Failed to get assignment {assignment_id}: {e}")
+            async with get_async_db_session() as db:
+                row = (await db.execute(_SELECT_DETAILS, {"aid": assignment_id})).one_or_none()
+            return AssignmentDetails(**row._mapping) if row else None
+        except Exception:
+            logger.error("Failed to get assignment %s", assignment_id, exc_info=True)
             return None
             
     async def can_user_interact(self, assignment_id: int, user_id: str) -> bool:
         """Check if user can interact with the assignment"""
         try:
-            with get_db_session() as db:
-                assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-                return assignment and assignment.user_id == user_id
-        except Exception as e:
-            logger.error(f"Failed to check user permissions for assignment {assignment_id}: {e}")
+            owner_id = _owner_cache.get(assignment_id)
+            if owner_id is None:
+                async with get_async_db_session() as db:
+                    result = await db.execute(_SELECT_OWNER, {"aid": assignment_id})
+                    owner_id = result.scalar_one_or_none()
+                if owner_id is None:
+                    return False
+                _owner_cache[assignment_id] = owner_id
+            return owner_id == user_id
+        except Exception:
+            logger.error("Failed to check user permissions for assignment %s", assignment_id, exc_info=True)
             return False
+            
+    async def _get_owner_and_status(self, db: AsyncSession, assignment_id: int):
+        """Narrow lookup used to explain why a guarded transition matched no rows"""
+        result = await db.execute(_SELECT_OWNER_AND_STATUS, {"aid": assignment_id})
+        return result.first()
+            
+    async def _commit_with_audit(self, db: AsyncSession, entries: List[Dict[str, Any]]):
+        """
+        Commit the transaction together with its audit rows.
+        
+        When the background audit writer is running, the rows are queued after the
+        commit instead, so the user-facing transaction skips the audit INSERT.
+        """
+        writer = getattr(self.bot, 'audit_writer', None)
+        if writer is None:
+            if entries:
+                await db.execute(insert(AuditLog), entries)
+            await db.commit()
+            return
+        
+        await db.commit()
+        writer.submit(entries)
+        
+    async def _get_statuses(self, db: AsyncSession, assignment_ids) -> Dict[int, Optional[AssignmentStatus]]:
+        """Current status for each ID in one query; IDs with no row map to None"""
+        if not assignment_ids:
+            return {}
+        
+        result = await db.execute(_SELECT_STATUSES, {"aids": list(assignment_ids)})
+        statuses = dict(result.all())
+        return {assignment_id: statuses.get(assignment_id) for assignment_id in assignment_ids}
+        
+    async def _insert_pending_request(
+        self,
+        db: AsyncSession,
+        assignment_id: int,
+        user_id: str,
+        approval_type: ApprovalType,
+        payload: Dict[str, Any]
+    ) -> Optional[int]:
+        """
+        Insert a pending approval request in a single INSERT ... SELECT.
+        
+        The row is only produced when the assignment belongs to the user and is active.
+        Duplicate pending requests of the same type are rejected by the database via
+        ON CONFLICT DO NOTHING against the ux_approval_pending partial unique index.
+        
+        Returns:
+            ID of the new request, or None if nothing was inserted
+        """
+        source = select(
+            literal(user_id),
+            Assignment.id,
+            literal(approval_type, ApprovalRequest.type.type),
+            literal(payload, ApprovalRequest.payload.type),
+            literal(ApprovalStatus.PENDING, ApprovalRequest.status.type)
+        ).where(
+            Assignment.id == assignment_id,
+            Assignment.user_id == user_id,
+            Assignment.status.in_(ACTIVE_STATUSES)
+        )
+        
+        insert_stmt = _UPSERT_INSERTS[db.bind.dialect.name](ApprovalRequest)
+        result = await db.execute(
+            insert_stmt
+            .from_select(["user_id", "assignment_id", "type", "payload", "status"], source)
+            .on_conflict_do_nothing(
+                index_elements=[ApprovalRequest.assignment_id, ApprovalRequest.type],
+                index_where=text(PENDING_APPROVAL_WHERE)
+            )
+            .returning(ApprovalRequest.id)
+        )
+        return result.scalar()
@@ -3,24 +3,82 @@ Assignment scheduler for hourly task posting and escalation handling.
 """
 import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 
 import discord
-import pytz
+from apscheduler.events import EVENT_JOB_MISSED
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, insert, or_, select, tuple_, update
+from sqlalchemy.orm import Session, contains_eager, selectinload
 
-from database import get_db_session
-from models import User, Shift, Assignment, AssignmentStatus, Settings, TaskTemplate, log_action
+from database import engine, get_async_db_session, get_db_session
+from models import User, Shift, Assignment, AssignmentStatus, Settings, build_audit, get_settings, instructions_preview, log_action, next_hour, utcnow
 from selection_service import SelectionService
 from thread_manager import ThreadManager
+from send_queue import DiscordSendQueue, EmbedBatcher
 from dashboard_core import DashboardManager
 
 logger = logging.getLogger(__name__)
 
+# Seconds to reuse the Settings row before reading it again
+SETTINGS_CACHE_TTL = 60
+
+# Acknowledgment reminder/escalation timing, measured from when the widget is posted
+ACK_REMINDER_AFTER = timedelta(minutes=5)
+ACK_ESCALATE_AFTER = timedelta(minutes=10)
+ACK_REMINDER_GRACE_SECONDS = 60  # Reminders delayed longer than this (e.g. by downtime) are dropped
+
+# Operators actively Data Labelling in an hour, built once and re-executed with bound parameters.
+# The onclause is explicit because assignments also references users via covering_for_user_id.
+_SELECT_REASSIGNMENT_CANDIDATES = (
+    select(User)
+    .join(Assignment, Assignment.user_id == User.id)
+    .where(
+        Assignment.hour_index == bindparam("hour_index"),
+        Assignment.status == AssignmentStatus.ACTIVE,
+        Assignment.task_name == "Data Labelling",
+        Assignment.user_id != bindparam("exclude_user_id"),
+        User.is_operator.is_(True)
+    )
+)
+
+# Statuses whose widgets still have usable buttons
+LIVE_WIDGET_STATUSES = (
+    AssignmentStatus.PENDING_ACK,
+    AssignmentStatus.ACTIVE,
+    AssignmentStatus.COVERING,
+    AssignmentStatus.PAUSED_BREAK,
+    AssignmentStatus.PAUSED_LUNCH
+)
+
+# Statuses in which the widget's edit/end early/break buttons apply, and the hours lunch can be taken
+WORKING_STATUSES = frozenset({AssignmentStatus.ACTIVE, AssignmentStatus.COVERING})
+LUNCH_HOURS = frozenset({3, 4, 5})
+
+# Scheduler whose jobs the persisted acknowledgment jobs run against
+_active_scheduler: Optional["AssignmentScheduler"] = None
+
+
+async def run_acknowledgment_reminder(assignment_id: int):
+    """Persisted job entry point; jobstores can only reference module-level functions"""
+    if _active_scheduler:
+        await _active_scheduler.remind_if_unacknowledged(assignment_id)
+
+
+async def run_acknowledgment_escalation(assignment_id: int):
+    """Persisted job entry point; jobstores can only reference module-level functions"""
+    if _active_scheduler:
+        await _active_scheduler.escalate_if_unacknowledged(assignment_id)
+
 
 def _ensure_aware(dt: datetime) -> datetime:
     """Return a UTC-aware datetime; assume UTC if naive."""
@@ -31,7 +89,7 @@ def _ensure_aware(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-@dataclass
+@dataclass(frozen=True)
 class ShiftInfo:
     """Information about a shift time period"""
     start_utc: datetime
@@ -39,19 +97,54 @@ class ShiftInfo:
     tz_name: str
 
 
+@lru_cache(maxsize=8)
+def _shift_times_for(timezone_str: str, day: date) -> Tuple[ShiftInfo, ...]:
+    """The three shift periods for a local calendar day; only changes once per day"""
+    tz = ZoneInfo(timezone_str)
+    
+    # Shifts start at 06:00, 14:00 and 22:00 local time and last 9 hours
+    shifts = []
+    for hour in (6, 14, 22):
+        start_utc = datetime(day.year, day.month, day.day, hour, tzinfo=tz).astimezone(timezone.utc)
+        shifts.append(ShiftInfo(
+            start_utc=start_utc,
+            end_utc=start_utc + timedelta(hours=9),
+            tz_name=timezone_str
+        ))
+        
+    return tuple(shifts)
+
+
 class AssignmentScheduler:
     """Manages hourly task assignments and escalations"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.scheduler = AsyncIOScheduler(timezone=timezone.utc)
+        # Recurring jobs are re-added on every start; acknowledgment jobs are persisted
+        # so reminders and escalations due across a restart still fire
+        self.scheduler = AsyncIOScheduler(
+            timezone=timezone.utc,
+            jobstores={
+                "default": MemoryJobStore(),
+                "acknowledgments": SQLAlchemyJobStore(engine=engine, tablename="scheduled_actions")
+            }
+        )
         self.selection_service = SelectionService()
         self.thread_manager = ThreadManager(bot)
         self.dashboard_manager = DashboardManager(bot)
+        self.send_queue = DiscordSendQueue()
+        # Admin alerts arriving together (e.g. a burst of escalations) share messages
+        self.admin_alerts = EmbedBatcher(self.send_queue)
         self.running = False
         
-        # Track pending acknowledgments for escalation
-        self.pending_acks: Dict[int, datetime] = {}  # assignment_id -> posted_at
+        # Guild each Discord user belongs to, kept current by member join/remove events
+        self._user_guild_index: Dict[int, discord.Guild] = {}
+        
+        # Resolved admin channel per guild, so alerts never re-fetch it over HTTP
+        self._admin_channel_cache: Dict[int, discord.abc.GuildChannel] = {}
+        
+        # Settings change rarely; cache them briefly instead of querying every tick
+        self._settings_cache: Optional[tuple[float, Settings]] = None
         
     async def start(self):
         """Start the scheduler"""
@@ -60,37 +153,54 @@ class AssignmentScheduler:
             
         logger.info("Starting assignment scheduler...")
         
-        # Schedule hourly assignment posting at the top of each hour
+        global _active_scheduler
+        _active_scheduler = self
+        
+        self._build_user_guild_index()
+        self._restore_widget_views()
+        self.bot.add_listener(self._on_member_join, "on_member_join")
+        self.bot.add_listener(self._on_member_remove, "on_member_remove")
+        self.bot.add_listener(self.thread_manager.on_thread_update, "on_thread_update")
+        self.bot.add_listener(self.thread_manager.on_thread_delete, "on_thread_delete")
+        self.bot.add_listener(self._on_guild_channel_delete, "on_guild_channel_delete")
+        
+        # Jobs are staggered so they don't all hit the DB and Discord at once:
+        # dashboard at second 30, hourly posting at minute 0 second 5.
+        # A run delayed by up to misfire_grace_time (e.g. across a restart) still happens.
+        
+        # Schedule hourly assignment posting at the top of each hour; missed hours are
+        # run individually (posting is idempotent) rather than coalesced away
         self.scheduler.add_job(
             self.post_hourly_assignments,
-            CronTrigger(minute=0, second=0),
+            CronTrigger(minute=0, second=5),
             id="hourly_assignments",
             max_instances=1,
-            coalesce=True
-        )
-        
-        # Schedule reminder checks every minute
-        self.scheduler.add_job(
-            self.check_pending_acknowledgments,
-            CronTrigger(second=0),
-            id="check_reminders",
-            max_instances=1,
-            coalesce=True
+            coalesce=False,
+            misfire_grace_time=30
         )
         
         # Schedule dashboard updates every minute  
         self.scheduler.add_job(
             self.dashboard_manager.update_dashboard,
-            CronTrigger(second=30),  # Offset by 30s to avoid conflicts
+            CronTrigger(second=30, jitter=5),  # Offset by 30s to avoid conflicts
             id="update_dashboard",
             max_instances=1,
-            coalesce=True
+            coalesce=True,
+            misfire_grace_time=30
         )
         
+        self.scheduler.add_listener(self._on_job_missed, EVENT_JOB_MISSED)
+        
+        self.send_queue.start()
+        self.admin_alerts.start()
         self.scheduler.start()
         self.running = True
         logger.info("Assignment scheduler started")
         
+    def _on_job_missed(self, event):
+        """Log scheduled runs dropped for starting later than misfire_grace_time"""
+        logger.warning(f"Scheduled job {event.job_id} missed its run at {event.scheduled_run_time}")
+        
     async def stop(self):
         """Stop the scheduler"""
         if not self.running:
@@ -98,34 +208,128 @@ class AssignmentScheduler:
             
         logger.info("Stopping assignment scheduler...")
         self.scheduler.shutdown(wait=True)
+        await self.admin_alerts.stop()
+        await self.send_queue.stop()
         self.running = False
         logger.info("Assignment scheduler stopped")
         
-    def get_shift_times(self, timezone_str: str = "America/Los_Angeles") -> List[ShiftInfo]:
-        """Get the three shift time periods in UTC"""
-        tz = pytz.timezone(timezone_str)
-        now = datetime.now(tz)
-        today = now.date()
+    def _schedule_ack_checks(self, assignment_id: int, posted_at: datetime):
+        """Persist the 5-minute reminder and 10-minute escalation jobs for an assignment"""
+        self.scheduler.add_job(
+            run_acknowledgment_reminder,
+            "date",
+            run_date=posted_at + ACK_REMINDER_AFTER,
+            args=[assignment_id],
+            id=f"ack_remind_{assignment_id}",
+            jobstore="acknowledgments",
+            replace_existing=True,
+            misfire_grace_time=ACK_REMINDER_GRACE_SECONDS
+        )
+        # Escalations are not dropped after downtime; the action checks the hour is still running
+        self.scheduler.add_job(
+            run_acknowledgment_escalation,
+            "date",
+            run_date=posted_at + ACK_ESCALATE_AFTER,
+            args=[assignment_id],
+            id=f"ack_escalate_{assignment_id}",
+            jobstore="acknowledgments",
+            replace_existing=True,
+            misfire_grace_time=None
+        )
+        
+    def cancel_ack_checks(self, assignment_id: int):
+        """Remove an assignment's persisted reminder and escalation jobs once it no longer needs acknowledging"""
+        for job_id in (f"ack_remind_{assignment_id}", f"ack_escalate_{assignment_id}"):
+            try:
+                self.scheduler.remove_job(job_id, jobstore="acknowledgments")
+            except JobLookupError:
+                pass
+        
+    def _restore_widget_views(self):
+        """Re-attach views to posted widgets that can still be interacted with"""
+        try:
+            with get_db_session() as db:
+                widgets = db.query(
+                    Assignment.id, Assignment.hour_index, Assignment.status, Assignment.widget_message_id
+                ).filter(
+                    Assignment.widget_message_id.isnot(None),
+                    Assignment.status.in_(LIVE_WIDGET_STATUSES)
+                ).all()
+            
+            for assignment_id, hour_index, status, message_id in widgets:
+                self.bot.add_view(AssignmentView(assignment_id, hour_index, status), message_id=int(message_id))
+            logger.info(f"Restored {len(widgets)} assignment widget views")
+        except Exception as e:
+            logger.error(f"Failed to restore assignment widget views: {e}")
+        
+    def _build_user_guild_index(self):
+        """Index every cached guild member by user ID"""
+        self._user_guild_index = {
+            member.id: guild
+            for guild in self.bot.guilds
+            for member in guild.members
+        }
+        logger.info(f"Indexed {len(self._user_guild_index)} guild members")
+        
+    async def _on_member_join(self, member: discord.Member):
+        """Index members as they join"""
+        self._user_guild_index[member.id] = member.guild
+        
+    async def _on_member_remove(self, member: discord.Member):
+        """Forget members who leave; other guilds are found again by the fallback scan"""
+        if self._user_guild_index.get(member.id) is member.guild:
+            del self._user_guild_index[member.id]
+            
+    def _guild_for_user(self, user_id) -> Optional[discord.Guild]:
+        """Guild the user is a member of, falling back to a scan for users not yet indexed"""
+        user_id = int(user_id)
+        guild = self._user_guild_index.get(user_id)
+        if guild is None:
+            guild = next((g for g in self.bot.guilds if g.get_member(user_id)), None)
+            if guild:
+                self._user_guild_index[user_id] = guild
+        return guild
+        
+    async def _get_admin_channel(self, guild: discord.Guild, settings: Settings) -> Optional[discord.abc.GuildChannel]:
+        """Resolve the configured admin channel in a guild, fetching it only on a cache miss"""
+        channel_id = int(settings.admin_channel_id)
+        channel = self._admin_channel_cache.get(guild.id)
+        if channel is None or channel.id != channel_id:
+            channel = guild.get_channel(channel_id)
+            if not channel:
+                try:
+                    channel = await guild.fetch_channel(channel_id)
+                except (discord.NotFound, discord.Forbidden):
+                    logger.error("Admin channel %s not found", settings.admin_channel_id)
+                    return None
+            self._admin_channel_cache[guild.id] = channel
+        return channel
         
-        # Define shift start times in local timezone
-        shift_starts_local = [
-            tz.localize(datetime.combine(today, datetime.min.time().replace(hour=6))),   # 06:00 PST
-            tz.localize(datetime.combine(today, datetime.min.time().replace(hour=14))),  # 14:00 PST  
-            tz.localize(datetime.combine(today, datetime.min.time().replace(hour=22))),  # 22:00 PST
-        ]
+    async def _on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        """Forget a cached admin channel once it is deleted"""
+        cached = self._admin_channel_cache.get(channel.guild.id)
+        if cached and cached.id == channel.id:
+            del self._admin_channel_cache[channel.guild.id]
+            
+    def _get_settings(self, db: Session) -> Settings:
+        """Return cached settings, reloading them once the cache is older than SETTINGS_CACHE_TTL"""
+        if self._settings_cache:
+            cached_at, settings = self._settings_cache
+            if time.monotonic() - cached_at < SETTINGS_CACHE_TTL:
+                return settings
         
-        shifts = []
-        for start_local in shift_starts_local:
-            start_utc = start_local.astimezone(timezone.utc)
-            end_utc = start_utc + timedelta(hours=9)  # 9-hour shifts
-            
-            shifts.append(ShiftInfo(
-                start_utc=start_utc,
-                end_utc=end_utc,
-                tz_name=timezone_str
-            ))
-            
-        return shifts
+        settings = get_settings(db)
+        self._settings_cache = (time.monotonic(), settings)
+        return settings
+        
+    def invalidate_settings_cache(self):
+        """Drop cached settings so the next read sees an admin's changes"""
+        self._settings_cache = None
+        
+    def get_shift_times(self, timezone_str: str = "America/Los_Angeles") -> List[ShiftInfo]:
+        """Get the three shift time periods in UTC"""
+        today = datetime.now(ZoneInfo(timezone_str)).date()
+        return list(_shift_times_for(timezone_str, today))
         
     def calculate_hour_index(self, shift_start: datetime, current_time: Optional[datetime] = None) -> int:
         """Calculate hour index (1-9) within a shift"""
@@ -136,7 +340,7 @@ class AssignmentScheduler:
         current_time = _ensure_aware(current_time)
             
         elapsed = current_time - shift_start
-        hour_index = int(elapsed.total_seconds() // 3600) + 1
+        hour_index = elapsed.days * 24 + elapsed.seconds // 3600 + 1
         
         # Clamp to valid range
         return max(1, min(9, hour_index))
@@ -144,36 +348,39 @@ class AssignmentScheduler:
     async def get_on_shift_operators(self) -> List[tuple[User, Shift, int]]:
         """Get all operators currently on shift with their hour index"""
         try:
-            with get_db_session() as db:
-                now_utc = datetime.now(timezone.utc)
-                operators = []
+            now_utc = datetime.now(timezone.utc)
+            operators = []
+            
+            async with get_async_db_session() as db:
+                # Find all active operator shifts, loading each shift's user in the same query
+                active_shifts = (await db.scalars(
+                    select(Shift).join(Shift.user).options(
+                        contains_eager(Shift.user)
+                    ).where(
+                        Shift.end_at.is_(None),  # Active shifts
+                        Shift.start_at <= now_utc,  # Already started
+                        Shift.start_at >= now_utc - timedelta(hours=9),  # Within 9-hour window
+                        User.is_operator.is_(True)
+                    )
+                )).all()
+            
+            for shift in active_shifts:
+                user = shift.user
                 
-                # Find all active shifts
-                active_shifts = db.query(Shift).filter(
-                    Shift.end_at.is_(None),  # Active shifts
-                    Shift.start_at <= now_utc,  # Already started
-                    Shift.start_at >= now_utc - timedelta(hours=9)  # Within 9-hour window
-                ).all()
+                # Calculate current hour index
+                hour_index = self.calculate_hour_index(shift.start_at, now_utc)
                 
-                for shift in active_shifts:
-                    user = shift.user
-                    if not user.is_operator:
-                        continue
-                        
-                    # Calculate current hour index
-                    hour_index = self.calculate_hour_index(shift.start_at, now_utc)
+                # Skip if past shift end (hour 9)
+                if hour_index > 9:
+                    continue
                     
-                    # Skip if past shift end (hour 9)
-                    if hour_index > 9:
-                        continue
-                        
-                    operators.append((user, shift, hour_index))
-                
-                logger.info(f"Found {len(operators)} operators on shift")
-                return operators
+                operators.append((user, shift, hour_index))
+            
+            logger.info("Found %d operators on shift", len(operators))
+            return operators
                 
         except Exception as e:
-            logger.error(f"Failed to get on-shift operators: {e}")
+            logger.error("Failed to get on-shift operators: %s", e)
             return []
             
     async def post_hourly_assignments(self):
@@ -187,27 +394,32 @@ class AssignmentScheduler:
                 return
                 
             with get_db_session() as db:
-                settings = db.query(Settings).first()
+                settings = self._get_settings(db)
                 if not settings or not settings.assignments_channel_id:
                     logger.warning("Assignment channel not configured")
                     return
                     
                 # Select Comms Lead using LRU
                 comms_lead = self.selection_service.select_comms_lead([op[0] for op in operators])
-                logger.info(f"Selected Comms Lead: {comms_lead.display_name if comms_lead else 'None'}")
+                logger.info("Selected Comms Lead: %s", comms_lead.display_name if comms_lead else 'None')
                 
-                # Create assignments
-                assignments_created = []
+                # Every assignment this hour ends at the next hour boundary
+                now_utc = utcnow()
+                ends_at = next_hour(now_utc)
+                
+                # Find assignments that already exist for this hour in one query
+                keys = [(user.id, shift.id, hour_index) for user, shift, hour_index in operators]
+                existing = set(
+                    db.query(Assignment.user_id, Assignment.shift_id, Assignment.hour_index).filter(
+                        tuple_(Assignment.user_id, Assignment.shift_id, Assignment.hour_index).in_(keys)
+                    ).all()
+                )
+                
+                # Build assignment rows
+                rows = []
                 for user, shift, hour_index in operators:
-                    # Check if assignment already exists for this hour
-                    existing = db.query(Assignment).filter(
-                        Assignment.user_id == user.id,
-                        Assignment.shift_id == shift.id,
-                        Assignment.hour_index == hour_index
-                    ).first()
-                    
-                    if existing:
-                        logger.info(f"Assignment already exists for {user.display_name} hour {hour_index}")
+                    if (user.id, shift.id, hour_index) in existing:
+                        logger.info("Assignment already exists for %s hour %s", user.display_name, hour_index)
                         continue
                     
                     # Determine task assignment
@@ -215,107 +427,114 @@ class AssignmentScheduler:
                         task_name = "Comms Lead"
                     else:
                         task_name = "Data Labelling"
-                        
-                    # Calculate expected end time (next hour boundary)
-                    now_utc = datetime.now(timezone.utc)
-                    ends_at = now_utc.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-                    
-                    # Create assignment
-                    assignment = Assignment(
-                        user_id=user.id,
-                        shift_id=shift.id,
-                        template_id=None,  # No template for default tasks
-                        task_name=task_name,
-                        params={},
-                        status=AssignmentStatus.PENDING_ACK,
-                        hour_index=hour_index,
-                        ends_at=ends_at
-                    )
                     
-                    db.add(assignment)
-                    assignments_created.append(assignment)
+                    rows.append({
+                        "user_id": user.id,
+                        "shift_id": shift.id,
+                        "template_id": None,  # No template for default tasks
+                        "task_name": task_name,
+                        "params": {},
+                        "status": AssignmentStatus.PENDING_ACK,
+                        "hour_index": hour_index,
+                        "ends_at": ends_at
+                    })
+                
+                # Insert in one batched statement; RETURNING hands back the ids and
+                # preloads the (empty) template for the widgets after the session closes
+                assignments_created = []
+                if rows:
+                    assignments_created = db.scalars(
+                        insert(Assignment).returning(Assignment).options(selectinload(Assignment.template)),
+                        rows
+                    ).all()
                 
-                # Commit all assignments
                 if assignments_created:
-                    db.commit()
-                    
-                    # Update Comms Lead timestamp
+                    # Update Comms Lead timestamp; the user was loaded by another session
                     if comms_lead:
-                        comms_lead.last_comms_lead_at = datetime.now(timezone.utc)
-                        db.commit()
+                        db.add(comms_lead)
+                        comms_lead.last_comms_lead_at = now_utc
                     
                     # Log the assignment posting
-                    log_action(
-                        db,
+                    db.add(build_audit(
                         action="assignments_posted",
                         metadata={
                             "count": len(assignments_created),
                             "comms_lead_id": comms_lead.id if comms_lead else None,
-                            "assignments": [
-                                {
-                                    "user_id": a.user_id,
-                                    "task_name": a.task_name,
-                                    "hour_index": a.hour_index
-                                }
-                                for a in assignments_created
-                            ]
+                            # Details live on the assignment rows; reports join on these ids
+                            "assignment_ids": [a.id for a in assignments_created]
                         }
-                    )
-                
-                # Post assignment widgets to threads
-                for assignment in assignments_created:
-                    try:
-                        await self.post_assignment_widget(assignment)
-                        # Track for acknowledgment checking
-                        self.pending_acks[assignment.id] = datetime.now(timezone.utc)
-                    except Exception as e:
-                        logger.error(f"Failed to post widget for assignment {assignment.id}: {e}")
-                        
-                logger.info(f"Posted {len(assignments_created)} new assignments")
+                    ))
+                    
+                    # Assignments, Comms Lead timestamp and audit row share one commit
+                    db.commit()
+            
+            # Post assignment widgets to threads concurrently so Discord latency overlaps;
+            # the session is already closed so no connection is held during the sends, and
+            # the send queue's per-channel and global buckets do the rate limiting
+            results = await asyncio.gather(
+                *(self._post_widget_tracked(assignment) for assignment in assignments_created)
+            )
+            for assignment_id, error in results:
+                if error:
+                    logger.error("Failed to post widget for assignment %s: %s", assignment_id, error)
+                    
+            logger.info("Posted %d new assignments", len(assignments_created))
                 
         except Exception as e:
-            logger.error(f"Failed to post hourly assignments: {e}")
+            logger.error("Failed to post hourly assignments: %s", e)
+            
+    async def _post_widget_tracked(self, assignment: Assignment) -> tuple[int, Optional[Exception]]:
+        """Post one widget and report (assignment_id, error) instead of raising"""
+        try:
+            await self.post_assignment_widget(assignment)
+            return assignment.id, None
+        except Exception as e:
+            return assignment.id, e
             
     async def post_assignment_widget(self, assignment: Assignment):
         """Post assignment widget to operator's thread"""
         try:
-            # Get user information
-            with get_db_session() as db:
-                user = db.query(User).filter(User.id == assignment.user_id).first()
-                if not user:
-                    logger.error(f"User {assignment.user_id} not found for assignment {assignment.id}")
-                    return
-                
-                # Get the guild (assuming single guild for now)
-                guild = None
-                for g in self.bot.guilds:
-                    if g.get_member(int(assignment.user_id)):
-                        guild = g
-                        break
-                
-                if not guild:
-                    logger.error(f"Could not find guild for user {assignment.user_id}")
-                    return
-                
-                # Get or create thread
-                thread = await self.thread_manager.get_or_create_operator_thread(
-                    guild, assignment.user_id, user.display_name
+            # Get user information; the session is released before any Discord calls
+            async with get_async_db_session() as db:
+                user = await db.get(User, assignment.user_id)
+            if not user:
+                logger.error("User %s not found for assignment %s", assignment.user_id, assignment.id)
+                return
+            
+            # Get the guild (assuming single guild for now)
+            guild = self._guild_for_user(assignment.user_id)
+            
+            if not guild:
+                logger.error("Could not find guild for user %s", assignment.user_id)
+                return
+            
+            # Get or create thread
+            thread = await self.thread_manager.get_or_create_operator_thread(
+                guild, assignment.user_id, user.display_name
+            )
+            
+            if not thread:
+                logger.error("Could not get/create thread for user %s", assignment.user_id)
+                return
+            
+            # Create assignment widget embed and view
+            embed, view = await self.create_assignment_widget(assignment, user)
+            
+            # Post the widget, remembering the message so its view can be restored after a restart
+            message = await self.send_queue.send(thread, embed=embed, view=view)
+            async with get_async_db_session() as db:
+                await db.execute(
+                    update(Assignment)
+                    .where(Assignment.id == assignment.id)
+                    .values(widget_message_id=str(message.id))
                 )
-                
-                if not thread:
-                    logger.error(f"Could not get/create thread for user {assignment.user_id}")
-                    return
-                
-                # Create assignment widget embed and view
-                embed, view = await self.create_assignment_widget(assignment, user)
-                
-                # Post the widget
-                message = await thread.send(embed=embed, view=view)
-                
-                logger.info(f"Posted assignment widget for {user.display_name}, task {assignment.task_name}")
-                
+                await db.commit()
+            self._schedule_ack_checks(assignment.id, datetime.now(timezone.utc))
+            
+            logger.info("Posted assignment widget for %s, task %s", user.display_name, assignment.task_name)
+            
         except Exception as e:
-            logger.error(f"Failed to post assignment widget for {assignment.id}: {e}")
+            logger.error("Failed to post assignment widget for %s: %s", assignment.id, e)
             
     async def create_assignment_widget(self, assignment: Assignment, user: User):
         """Create embed and view for assignment widget"""
@@ -365,7 +584,7 @@ class AssignmentScheduler:
         if assignment.started_at:
             embed.add_field(
                 name="Started At",
-                value=f"<t:{int(assignment.started_at.timestamp())}:t>",
+                value=f"<t:{int(_ensure_aware(assignment.started_at).timestamp())}:t>",
                 inline=True
             )
         
@@ -377,16 +596,14 @@ class AssignmentScheduler:
                 inline=True
             )
         
-        # Add instructions if available
-        with get_db_session() as db:
-            if assignment.template_id:
-                template = db.query(TaskTemplate).filter(TaskTemplate.id == assignment.template_id).first()
-                if template and template.instructions:
-                    embed.add_field(
-                        name="Instructions",
-                        value=template.instructions[:200] + ("..." if len(template.instructions) > 200 else ""),
-                        inline=False
-                    )
+        # Add instructions if available; callers load assignment.template up front
+        template = assignment.template
+        if template and template.instructions:
+            embed.add_field(
+                name="Instructions",
+                value=instructions_preview(template.instructions),
+                inline=False
+            )
         
         embed.set_footer(text=f"Assignment ID: {assignment.id}")
         embed.timestamp = datetime.utcnow()
@@ -396,53 +613,70 @@ class AssignmentScheduler:
         
         return embed, view
             
-    async def check_pending_acknowledgments(self):
-        """Check for pending acknowledgments and send reminders/escalate"""
+    async def remind_if_unacknowledged(self, assignment_id: int):
+        """Send the 5-minute reminder if the assignment is still waiting for acknowledgment"""
+        try:
+            # Load what the reminder needs, then release the session before any Discord I/O
+            with get_db_session() as db:
+                assignment = db.query(Assignment).filter(
+                    Assignment.id == assignment_id,
+                    Assignment.status == AssignmentStatus.PENDING_ACK
+                ).first()
+                if not assignment:
+                    return
+                
+                user = db.get(User, assignment.user_id)
+                settings = self._get_settings(db)
+            
+            await self.send_acknowledgment_reminder(assignment, user, settings)
+                
+        except Exception as e:
+            logger.error("Failed to run acknowledgment reminder for %s: %s", assignment_id, e)
+            
+    async def escalate_if_unacknowledged(self, assignment_id: int):
+        """Escalate a still-unacknowledged non-Data Labelling assignment while its hour is running"""
         try:
             now_utc = datetime.now(timezone.utc)
             
             with get_db_session() as db:
-                # Find assignments pending acknowledgment
-                pending_assignments = db.query(Assignment).filter(
+                assignment = db.query(Assignment).filter(
+                    Assignment.id == assignment_id,
                     Assignment.status == AssignmentStatus.PENDING_ACK,
-                    Assignment.created_at <= now_utc - timedelta(minutes=1)  # At least 1 minute old
-                ).all()
+                    Assignment.task_name != "Data Labelling",
+                    or_(Assignment.ends_at.is_(None), Assignment.ends_at > now_utc)
+                ).first()
+                if not assignment:
+                    return
+                
+                user = db.get(User, assignment.user_id)
+                settings = self._get_settings(db)
+            
+            await self.escalate_unacknowledged_assignment(assignment, user, settings)
                 
-                for assignment in pending_assignments:
-                    created_at = _ensure_aware(assignment.created_at)
-                    assignment_age = now_utc - created_at
-                    
-                    # 5-minute reminder
-                    if assignment_age >= timedelta(minutes=5) and assignment_age < timedelta(minutes=6):
-                        await self.send_acknowledgment_reminder(assignment)
-                        
-                    # 10-minute escalation for non-Data Labelling
-                    elif assignment_age >= timedelta(minutes=10) and assignment.task_name != "Data Labelling":
-                        await self.escalate_unacknowledged_assignment(assignment)
-                        
         except Exception as e:
-            logger.error(f"Failed to check pending acknowledgments: {e}")
+            logger.error("Failed to run acknowledgment escalation for %s: %s", assignment_id, e)
             
-    async def send_acknowledgment_reminder(self, assignment: Assignment):
+    async def send_acknowledgment_reminder(
+        self,
+        assignment: Assignment,
+        user: Optional[User],
+        settings: Settings
+    ):
         """Send 5-minute reminder to operator and alert admins"""
         try:
-            logger.info(f"Sending 5-minute reminder for assignment {assignment.id}")
+            logger.info("Sending 5-minute reminder for assignment %s", assignment.id)
+            
+            if not user:
+                logger.error("User %s not found for reminder", assignment.user_id)
+                return
+            
+            # Send reminder to operator thread
+            await self._send_operator_reminder(assignment, user, settings)
+            
+            # Send alert to admin channel
+            await self._send_admin_alert(assignment, user, settings, "5-minute reminder")
             
-            # Get user details
             with get_db_session() as db:
-                user = db.query(User).filter(User.id == assignment.user_id).first()
-                if not user:
-                    logger.error(f"User {assignment.user_id} not found for reminder")
-                    return
-                
-                settings = get_settings(db)
-                
-                # Send reminder to operator thread
-                await self._send_operator_reminder(assignment, user, settings)
-                
-                # Send alert to admin channel
-                await self._send_admin_alert(assignment, user, settings, "5-minute reminder")
-                
                 log_action(
                     db,
                     action="acknowledgment_reminder_sent",
@@ -455,20 +689,16 @@ class AssignmentScheduler:
                 )
             
         except Exception as e:
-            logger.error(f"Failed to send acknowledgment reminder for {assignment.id}: {e}")
+            logger.error("Failed to send acknowledgment reminder for %s: %s", assignment.id, e)
             
     async def _send_operator_reminder(self, assignment: Assignment, user: User, settings):
         """Send reminder message to operator's thread"""
         try:
             # Find guild and get thread
-            guild = None
-            for g in self.bot.guilds:
-                if g.get_member(int(assignment.user_id)):
-                    guild = g
-                    break
+            guild = self._guild_for_user(assignment.user_id)
             
             if not guild:
-                logger.error(f"Could not find guild for user {assignment.user_id}")
+                logger.error("Could not find guild for user %s", assignment.user_id)
                 return
                 
             thread = await self.thread_manager.get_or_create_operator_thread(
@@ -476,7 +706,7 @@ class AssignmentScheduler:
             )
             
             if not thread:
-                logger.error(f"Could not get thread for user {assignment.user_id}")
+                logger.error("Could not get thread for user %s", assignment.user_id)
                 return
             
             # Create reminder embed
@@ -497,11 +727,11 @@ class AssignmentScheduler:
             discord_user = guild.get_member(int(assignment.user_id))
             content = f"{discord_user.mention} 📋 Task acknowledgment needed!" if discord_user else "📋 Task acknowledgment needed!"
             
-            await thread.send(content=content, embed=embed)
-            logger.info(f"Sent reminder to {user.display_name}")
+            await self.send_queue.send(thread, content=content, embed=embed)
+            logger.info("Sent reminder to %s", user.display_name)
             
         except Exception as e:
-            logger.error(f"Failed to send operator reminder: {e}")
+            logger.error("Failed to send operator reminder: %s", e)
             
     async def _send_admin_alert(self, assignment: Assignment, user: User, settings, alert_type: str):
         """Send alert to admin channel"""
@@ -511,22 +741,14 @@ class AssignmentScheduler:
                 return
             
             # Find guild and admin channel
-            guild = None
-            for g in self.bot.guilds:
-                if g.get_member(int(assignment.user_id)):
-                    guild = g
-                    break
+            guild = self._guild_for_user(assignment.user_id)
             
             if not guild:
                 return
                 
-            admin_channel = guild.get_channel(int(settings.admin_channel_id))
+            admin_channel = await self._get_admin_channel(guild, settings)
             if not admin_channel:
-                try:
-                    admin_channel = await guild.fetch_channel(int(settings.admin_channel_id))
-                except (discord.NotFound, discord.Forbidden):
-                    logger.error(f"Admin channel {settings.admin_channel_id} not found")
-                    return
+                return
             
             # Create alert embed
             embed = discord.Embed(
@@ -571,66 +793,77 @@ class AssignmentScheduler:
             embed.set_footer(text=f"Assignment ID: {assignment.id}")
             embed.timestamp = datetime.utcnow()
             
-            await admin_channel.send(embed=embed)
-            logger.info(f"Sent admin alert for assignment {assignment.id}")
+            await self.admin_alerts.add(admin_channel, embed)
+            logger.info("Queued admin alert for assignment %s", assignment.id)
             
         except Exception as e:
-            logger.error(f"Failed to send admin alert: {e}")
+            logger.error("Failed to send admin alert: %s", e)
             
-    async def escalate_unacknowledged_assignment(self, assignment: Assignment):
+    async def escalate_unacknowledged_assignment(
+        self,
+        assignment: Assignment,
+        user: Optional[User],
+        settings: Settings
+    ):
         """Escalate unacknowledged non-Data Labelling assignment"""
         try:
-            logger.info(f"Escalating unacknowledged assignment {assignment.id}")
+            logger.info("Escalating unacknowledged assignment %s", assignment.id)
+            
+            if not user:
+                logger.error("User %s not found for escalation", assignment.user_id)
+                return
+            
+            # Try to find a Data Labelling operator to reassign to
+            candidates = await self.get_reassignment_candidates(assignment)
             
+            # Reassign to first candidate
+            new_assignee = candidates[0] if candidates else None
+            
+            # The reassignment and its audit row commit in one short transaction
             with get_db_session() as db:
-                user = db.query(User).filter(User.id == assignment.user_id).first()
-                settings = get_settings(db)
-                
-                if not user:
-                    logger.error(f"User {assignment.user_id} not found for escalation")
+                # Re-read under this session; the operator may have started the task meanwhile
+                assignment = db.get(Assignment, assignment.id)
+                if not assignment or assignment.status != AssignmentStatus.PENDING_ACK:
                     return
                 
-                # Try to find a Data Labelling operator to reassign to
-                candidates = await self.get_reassignment_candidates(assignment)
-                
-                if candidates:
-                    # Reassign to first candidate
-                    new_assignee = candidates[0]
-                    
-                    success = await self._perform_reassignment(assignment, new_assignee, db)
-                    
-                    if success:
-                        # Send notifications about successful reassignment
-                        await self._send_reassignment_notifications(
-                            assignment, user, new_assignee, settings, "escalation"
-                        )
-                    else:
-                        # Fallback: send admin alert about failed reassignment
-                        await self._send_admin_alert(
-                            assignment, user, settings, "escalation - reassignment failed"
-                        )
-                else:
-                    # No candidates available, send admin alert
-                    await self._send_admin_alert(
-                        assignment, user, settings, "escalation - no candidates available"
-                    )
-                    logger.warning(f"No reassignment candidates available for assignment {assignment.id}")
-                
-                log_action(
-                    db,
+                success = new_assignee is not None and await self._perform_reassignment(assignment, new_assignee, db)
+                db.add(build_audit(
                     action="assignment_escalated",
                     target=str(assignment.id),
                     metadata={
                         "user_id": assignment.user_id,
                         "task_name": assignment.task_name,
                         "candidates_found": len(candidates),
-                        "reassigned_to": candidates[0].id if candidates else None,
+                        "reassigned_to": new_assignee.id if new_assignee else None,
                         "minutes_elapsed": 10
                     }
+                ))
+                db.commit()
+            
+            if success:
+                self.cancel_ack_checks(assignment.id)
+                logger.info(
+                    f"Reassigned {assignment.task_name} from {assignment.user_id} "
+                    f"to {new_assignee.id} due to escalation"
+                )
+                # Send notifications about successful reassignment
+                await self._send_reassignment_notifications(
+                    assignment, user, new_assignee, settings, "escalation"
                 )
+            elif new_assignee:
+                # Fallback: send admin alert about failed reassignment
+                await self._send_admin_alert(
+                    assignment, user, settings, "escalation - reassignment failed"
+                )
+            else:
+                # No candidates available, send admin alert
+                await self._send_admin_alert(
+                    assignment, user, settings, "escalation - no candidates available"
+                )
+                logger.warning("No reassignment candidates available for assignment %s", assignment.id)
             
         except Exception as e:
-            logger.error(f"Failed to escalate assignment {assignment.id}: {e}")
+            logger.error("Failed to escalate assignment %s: %s", assignment.id, e)
             
     async def _perform_reassignment(
         self, 
@@ -638,7 +871,7 @@ class AssignmentScheduler:
         new_assignee: User, 
         db: Session
     ) -> bool:
-        """Perform the actual reassignment of a task"""
+        """Apply the reassignment to the session; the caller commits it"""
         try:
             # Find the new assignee's current Data Labelling assignment  
             current_assignment = db.query(Assignment).filter(
@@ -663,13 +896,6 @@ class AssignmentScheduler:
             current_assignment.covering_for_user_id = original_assignment.user_id
             # Keep it as ACTIVE since they were already working
             
-            db.commit()
-            
-            logger.info(
-                f"Reassigned {original_assignment.task_name} from {original_assignment.user_id} "
-                f"to {new_assignee.id} due to escalation"
-            )
-            
             return True
             
         except Exception as e:
@@ -688,69 +914,90 @@ class AssignmentScheduler:
         """Send notifications about task reassignment"""
         try:
             # Find guild
-            guild = None
-            for g in self.bot.guilds:
-                if g.get_member(int(new_assignee.id)):
-                    guild = g
-                    break
+            guild = self._guild_for_user(new_assignee.id)
             
             if not guild:
                 logger.error("Could not find guild for reassignment notifications")
                 return
             
-            # Notify new assignee in their thread
-            new_thread = await self.thread_manager.get_or_create_operator_thread(
-                guild, new_assignee.id, new_assignee.display_name
-            )
-            
-            if new_thread:
-                embed = discord.Embed(
-                    title="🔄 Task Reassignment",
-                    description=(
-                        f"You've been assigned a new task due to {reason}.\n\n"
-                        f"**New Task:** {original_assignment.task_name}\n"
-                        f"**Hour:** {original_assignment.hour_index}\n"
-                        f"**Covering for:** {original_user.display_name}\n\n"
-                        "This task is now active - please begin working on it."
-                    ),
-                    color=0x3498db,
-                    timestamp=datetime.utcnow()
-                )
-                
-                discord_user = guild.get_member(int(new_assignee.id))
-                content = f"{discord_user.mention} 📋 New task assignment!" if discord_user else "📋 New task assignment!"
-                
-                await new_thread.send(content=content, embed=embed)
-            
-            # Notify original user in their thread
-            orig_thread = await self.thread_manager.get_or_create_operator_thread(
-                guild, original_assignment.user_id, original_user.display_name
-            )
-            
-            if orig_thread:
-                embed = discord.Embed(
-                    title="⚠️ Task Reassigned",
-                    description=(
-                        f"Your task has been reassigned due to no acknowledgment.\n\n"
-                        f"**Task:** {original_assignment.task_name}\n"
-                        f"**Hour:** {original_assignment.hour_index}\n"
-                        f"**Reassigned to:** {new_assignee.display_name}\n\n"
-                        "Please make sure to acknowledge future tasks promptly."
-                    ),
-                    color=0xff6b6b,
-                    timestamp=datetime.utcnow()
-                )
-                
-                await orig_thread.send(embed=embed)
-            
-            # Send admin notification
-            await self._send_admin_reassignment_alert(
-                original_assignment, original_user, new_assignee, settings, reason
+            # The three notifications are independent, so overlap their Discord round trips
+            results = await asyncio.gather(
+                self._notify_new_assignee(guild, original_assignment, original_user, new_assignee, reason),
+                self._notify_original_user(guild, original_assignment, original_user, new_assignee),
+                self._send_admin_reassignment_alert(
+                    original_assignment, original_user, new_assignee, settings, reason
+                ),
+                return_exceptions=True
             )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to send reassignment notification: {result}")
             
         except Exception as e:
             logger.error(f"Failed to send reassignment notifications: {e}")
             
+    async def _notify_new_assignee(
+        self,
+        guild: discord.Guild,
+        original_assignment: Assignment,
+        original_user: User,
+        new_assignee: User,
+        reason: str
+    ):
+        """Tell the new assignee about the task in their thread"""
+        new_thread = await self.thread_manager.get_or_create_operator_thread(
+            guild, new_assignee.id, new_assignee.display_name
+        )
+        if not new_thread:
+            return
+        
+        embed = discord.Embed(
+            title="🔄 Task Reassignment",
+            description=(
+                f"You've been assigned a new task due to {reason}.\n\n"
+                f"**New Task:** {original_assignment.task_name}\n"
+                f"**Hour:** {original_assignment.hour_index}\n"
+                f"**Covering for:** {original_user.display_name}\n\n"
+                "This task is now active - please begin working on it."
+            ),
+            color=0x3498db,
+            timestamp=datetime.utcnow()
+        )
+        
+        discord_user = guild.get_member(int(new_assignee.id))
+        content = f"{discord_user.mention} 📋 New task assignment!" if discord_user else "📋 New task assignment!"
+        
+        await self.send_queue.send(new_thread, content=content, embed=embed)
+        
+    async def _notify_original_user(
+        self,
+        guild: discord.Guild,
+        original_assignment: Assignment,
+        original_user: User,
+        new_assignee: User
+    ):
+        """Tell the original operator their task was reassigned"""
+        orig_thread = await self.thread_manager.get_or_create_operator_thread(
+            guild, original_assignment.user_id, original_user.display_name
+        )
+        if not orig_thread:
+            return
+        
+        embed = discord.Embed(
+            title="⚠️ Task Reassigned",
+            description=(
+                f"Your task has been reassigned due to no acknowledgment.\n\n"
+                f"**Task:** {original_assignment.task_name}\n"
+                f"**Hour:** {original_assignment.hour_index}\n"
+                f"**Reassigned to:** {new_assignee.display_name}\n\n"
+                "Please make sure to acknowledge future tasks promptly."
+            ),
+            color=0xff6b6b,
+            timestamp=datetime.utcnow()
+        )
+        
+        await self.send_queue.send(orig_thread, embed=embed)
+            
     async def _send_admin_reassignment_alert(
         self,
         assignment: Assignment,
@@ -765,16 +1012,12 @@ class AssignmentScheduler:
                 return
             
             # Find guild and admin channel
-            guild = None
-            for g in self.bot.guilds:
-                if g.get_member(int(original_user.id)):
-                    guild = g
-                    break
+            guild = self._guild_for_user(original_user.id)
             
             if not guild:
                 return
             
-            admin_channel = guild.get_channel(int(settings.admin_channel_id))
+            admin_channel = await self._get_admin_channel(guild, settings)
             if not admin_channel:
                 return
             
@@ -817,7 +1060,7 @@ class AssignmentScheduler:
             embed.set_footer(text=f"Assignment ID: {assignment.id}")
             embed.timestamp = datetime.utcnow()
             
-            await admin_channel.send(embed=embed)
+            await self.admin_alerts.add(admin_channel, embed)
             
         except Exception as e:
             logger.error(f"Failed to send admin reassignment alert: {e}")
@@ -825,19 +1068,14 @@ class AssignmentScheduler:
     async def get_reassignment_candidates(self, assignment: Assignment) -> List[User]:
         """Find operators available for reassignment"""
         try:
-            with get_db_session() as db:
-                now_utc = datetime.now(timezone.utc)
-                
+            async with get_async_db_session() as db:
                 # Find operators with Data Labelling assignments in the same hour
-                candidates = db.query(User).join(Assignment).filter(
-                    Assignment.hour_index == assignment.hour_index,
-                    Assignment.status == AssignmentStatus.ACTIVE,
-                    Assignment.task_name == "Data Labelling",
-                    Assignment.user_id != assignment.user_id,
-                    User.is_operator == True
-                ).all()
+                candidates = (await db.scalars(_SELECT_REASSIGNMENT_CANDIDATES, {
+                    "hour_index": assignment.hour_index,
+                    "exclude_user_id": assignment.user_id
+                })).all()
                 
-                return candidates
+            return candidates
                 
         except Exception as e:
             logger.error(f"Failed to get reassignment candidates: {e}")
@@ -858,11 +1096,15 @@ class AssignmentView(discord.ui.View):
     """Interactive view for assignment widgets with buttons"""
     
     def __init__(self, assignment_id: int, hour_index: int, status: AssignmentStatus):
-        super().__init__(timeout=3600)  # 1 hour timeout
+        # Persistent: no per-widget timeout task; views are re-registered on startup
+        super().__init__(timeout=None)
         self.assignment_id = assignment_id
         self.hour_index = hour_index
         self.assignment_status = status
         
+        # What the widget message last showed, so unchanged refreshes skip the Discord edit
+        self._last_render: Optional[tuple] = None
+        
         # Configure buttons based on current status
         self._configure_buttons()
     
@@ -871,18 +1113,14 @@ class AssignmentView(discord.ui.View):
         # Start button - only available if pending acknowledgment
         self.start_button.disabled = self.assignment_status != AssignmentStatus.PENDING_ACK
         
-        # Edit/End Early buttons - only available if active
-        can_edit = self.assignment_status in [AssignmentStatus.ACTIVE, AssignmentStatus.COVERING]
-        self.edit_button.disabled = not can_edit
-        self.end_early_button.disabled = not can_edit
-        
-        # Break buttons - available if active and not already on break/lunch
-        can_break = self.assignment_status in [AssignmentStatus.ACTIVE, AssignmentStatus.COVERING]
-        self.break_button.disabled = not can_break
+        # Edit/End Early and break buttons - only available if active (not already on break/lunch)
+        is_active = self.assignment_status in WORKING_STATUSES
+        self.edit_button.disabled = not is_active
+        self.end_early_button.disabled = not is_active
+        self.break_button.disabled = not is_active
         
-        # Lunch button - only available hours 3-5 and if active
-        can_lunch = (can_break and self.hour_index in [3, 4, 5])
-        self.lunch_button.disabled = not can_lunch
+        # Lunch button - only available in lunch hours and if active
+        self.lunch_button.disabled = not (is_active and self.hour_index in LUNCH_HOURS)
     
     @discord.ui.button(
         label="▶️ Start Task",
@@ -898,18 +1136,22 @@ class AssignmentView(discord.ui.View):
             operations = AssignmentOperations(interaction.client)
             
             # Start the task
-            success, message = await operations.start_task(
+            success, message, started = await operations.start_task(
                 self.assignment_id,
                 str(interaction.user.id)
             )
             
             if success:
+                # Acknowledged, so the pending reminder and escalation jobs have nothing left to do
+                if _active_scheduler:
+                    _active_scheduler.cancel_ack_checks(self.assignment_id)
+                
                 # Update button states
                 self.assignment_status = AssignmentStatus.ACTIVE
                 self._configure_buttons()
                 
                 # Update the widget message
-                await self._update_widget_message(interaction, operations)
+                await self._update_widget_message(interaction, operations, started)
                 
                 await interaction.response.send_message(
                     f"✅ {message}",
@@ -939,20 +1181,20 @@ class AssignmentView(discord.ui.View):
             from .assignment_operations import AssignmentOperations
             from .modals import EditTaskModal
             
-            # Check if user can edit this assignment
+            # Get current assignment parameters; the same read answers the ownership check
             operations = AssignmentOperations(interaction.client)
-            if not await operations.can_user_interact(self.assignment_id, str(interaction.user.id)):
+            assignment = await operations.get_assignment_details(self.assignment_id)
+            if not assignment:
                 await interaction.response.send_message(
-                    "❌ You can only edit your own tasks.",
+                    "❌ Assignment not found.",
                     ephemeral=True
                 )
                 return
             
-            # Get current assignment parameters
-            assignment = await operations.get_assignment_details(self.assignment_id)
-            if not assignment:
+            # Check if user can edit this assignment
+            if assignment.user_id != str(interaction.user.id):
                 await interaction.response.send_message(
-                    "❌ Assignment not found.",
+                    "❌ You can only edit your own tasks.",
                     ephemeral=True
                 )
                 return
@@ -979,20 +1221,20 @@ class AssignmentView(discord.ui.View):
             from .assignment_operations import AssignmentOperations
             from .modals import EndEarlyModal
             
-            # Check if user can end this assignment early
+            # Verify assignment is in correct state; the same read answers the ownership check
             operations = AssignmentOperations(interaction.client)
-            if not await operations.can_user_interact(self.assignment_id, str(interaction.user.id)):
+            assignment = await operations.get_assignment_details(self.assignment_id)
+            if not assignment:
                 await interaction.response.send_message(
-                    "❌ You can only end your own tasks early.",
+                    "❌ Assignment not found.",
                     ephemeral=True
                 )
                 return
             
-            # Verify assignment is in correct state
-            assignment = await operations.get_assignment_details(self.assignment_id)
-            if not assignment:
+            # Check if user can end this assignment early
+            if assignment.user_id != str(interaction.user.id):
                 await interaction.response.send_message(
-                    "❌ Assignment not found.",
+                    "❌ You can only end your own tasks early.",
                     ephemeral=True
                 )
                 return
@@ -1059,22 +1301,33 @@ class AssignmentView(discord.ui.View):
                 ephemeral=True
             )
     
-    async def _update_widget_message(self, interaction: discord.Interaction, operations):
-        """Update the widget message with current assignment state"""
+    async def _update_widget_message(
+        self,
+        interaction: discord.Interaction,
+        operations,
+        assignment=None
+    ):
+        """Update the widget message with current assignment state, read back unless already given"""
         try:
-            # Get updated assignment details
-            assignment = await operations.get_assignment_details(self.assignment_id)
+            # Get updated assignment details; template instructions come back in the same query
+            if assignment is None:
+                assignment = await operations.get_assignment_details(self.assignment_id)
             if not assignment:
                 return
             
-            # Get user details
-            with get_db_session() as db:
-                user = db.query(User).filter(User.id == assignment.user_id).first()
-                if not user:
-                    return
-            
             # Recreate embed with updated information
-            embed = await self._create_updated_embed(assignment, user)
+            embed = await self._create_updated_embed(assignment)
+            
+            # Skip the edit (and its rate-limit cost) if the message would look the same
+            render = (
+                embed.title,
+                embed.color.value if embed.color else None,
+                tuple((field.name, field.value) for field in embed.fields),
+                tuple(item.disabled for item in self.children if isinstance(item, discord.ui.Button))
+            )
+            if render == self._last_render:
+                return
+            self._last_render = render
             
             # Update the message (this will be deferred if interaction was already responded to)
             try:
@@ -1091,16 +1344,22 @@ class AssignmentView(discord.ui.View):
         except Exception as e:
             logger.error(f"Failed to update widget message: {e}")
     
-    async def _create_updated_embed(self, assignment: Assignment, user: User):
-        """Create updated embed with current assignment state"""
-        # Calculate time remaining
+    async def _create_updated_embed(self, assignment):
+        """Create updated embed from an AssignmentDetails snapshot"""
+        now_ts = time.time()
+        now = datetime.fromtimestamp(now_ts, tz=timezone.utc)
+        
+        # Calculate time remaining on epoch seconds rather than via a timedelta
+        # SQLite hands back naive datetimes; .timestamp() would read them as local time
+        started_at = _ensure_aware(assignment.started_at)
+        ends_at = _ensure_aware(assignment.ends_at)
+        
         time_remaining = "Unknown"
-        if assignment.ends_at:
-            now = datetime.now(timezone.utc)
-            if assignment.ends_at > now:
-                remaining = assignment.ends_at - now
-                hours = int(remaining.total_seconds() // 3600)
-                minutes = int((remaining.total_seconds() % 3600) // 60)
+        if ends_at:
+            remaining = ends_at.timestamp() - now_ts
+            if remaining > 0:
+                hours, seconds = divmod(int(remaining), 3600)
+                minutes = seconds // 60
                 if hours > 0:
                     time_remaining = f"{hours}h {minutes}m"
                 else:
@@ -1141,24 +1400,24 @@ class AssignmentView(discord.ui.View):
             inline=True
         )
         
-        if assignment.started_at:
+        if started_at:
             embed.add_field(
                 name="Started At",
-                value=f"<t:{int(assignment.started_at.timestamp())}:t>",
+                value=f"<t:{int(started_at.timestamp())}:t>",
                 inline=True
             )
         
-        if assignment.ends_at:
+        if ends_at:
             embed.add_field(
                 name="Ends At",
-                value=f"<t:{int(assignment.ends_at.timestamp())}:t>",
+                value=f"<t:{int(ends_at.timestamp())}:t>",
                 inline=True
             )
         
         # Add task completion indicator
         if assignment.status == AssignmentStatus.COMPLETED:
-            if assignment.ended_at and assignment.started_at:
-                duration_minutes = int((assignment.ended_at - assignment.started_at).total_seconds() / 60)
+            if assignment.ended_at and started_at:
+                duration_minutes = int((_ensure_aware(assignment.ended_at) - started_at).total_seconds() / 60)
                 embed.add_field(
                     name="Duration",
                     value=f"{duration_minutes} minutes",
@@ -1171,27 +1430,14 @@ class AssignmentView(discord.ui.View):
             )
         
         # Add instructions if available
-        with get_db_session() as db:
-            if assignment.template_id:
-                template = db.query(TaskTemplate).filter(TaskTemplate.id == assignment.template_id).first()
-                if template and template.instructions:
-                    embed.add_field(
-                        name="Instructions",
-                        value=template.instructions[:200] + ("..." if len(template.instructions) > 200 else ""),
-                        inline=False
-                    )
+        if assignment.instructions:
+            embed.add_field(
+                name="Instructions",
+                value=instructions_preview(assignment.instructions),
+                inline=False
+            )
         
         embed.set_footer(text=f"Assignment ID: {assignment.id}")
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = now
         
         return embed
-    
-    async def on_timeout(self):
-        """Called when the view times out"""
-        # Disable all buttons
-        for item in self.children:
-            if isinstance(item, discord.ui.Button):
-                item.disabled = True
-        
-        # Note: We can't edit the message here without storing a reference to it
-        # The message editing will be handled by the scheduler's periodic updates
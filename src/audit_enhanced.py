@@ -1,19 +1,67 @@
 """
 Enhanced audit logging system for comprehensive compliance tracking.
 """
+import itertools
 import logging
 import json
-from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Any, Optional, List
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 import discord
+from sqlalchemy import func, insert, select
 
-from .database import get_db_session
-from .models import AuditLog, get_settings, log_action
+from database import get_async_db_session, get_db_session
+from models import AuditLog, audit_values, get_settings
+from send_queue import DiscordSendQueue, EmbedBatcher
 
 logger = logging.getLogger(__name__)
 
+# Events important enough to mirror to the Discord audit channel
+_IMPORTANT_EVENTS = frozenset({
+    'assignment_created',
+    'assignment_escalated',
+    'break_request_approved',
+    'break_request_denied',
+    'edit_request_approved',
+    'edit_request_denied',
+    'end_early_approved',
+    'end_early_denied',
+    'force_assignment',
+    'settings_updated',
+    'task_template_created',
+    'task_template_deleted',
+    'dashboard_snapshot_created',
+    'system_error',
+    'security_violation'
+})
+
+# Embed color per mirrored event: red for errors, green for success, orange for warnings
+_EVENT_COLORS = {
+    'system_error': 0xff0000,
+    'security_violation': 0xff0000,
+    'assignment_created': 0x00ff00,
+    'break_request_approved': 0x00ff00,
+    'edit_request_approved': 0x00ff00,
+    'end_early_approved': 0x00ff00,
+    'task_template_created': 0x00ff00,
+    'dashboard_snapshot_created': 0x00ff00,
+    'assignment_escalated': 0xffa500,
+    'break_request_denied': 0xffa500,
+    'edit_request_denied': 0xffa500,
+    'end_early_denied': 0xffa500,
+}
+
+# Source of InteractionEvent.event_id
+_event_seq = itertools.count(1)
+
+
+@lru_cache(maxsize=64)
+def _audit_title(event_type: str) -> str:
+    """Embed title for an event type"""
+    return f"🔍 Audit: {event_type.replace('_', ' ').title()}"
+
 
 @dataclass
 class InteractionEvent:
@@ -29,16 +77,29 @@ class InteractionEvent:
     metadata: Dict[str, Any]
     timestamp: datetime
     session_id: Optional[str] = None
+    # Per-process sequence number, shown in the mirrored embed's footer
+    event_id: int = field(default_factory=lambda: next(_event_seq))
 
 
 class EnhancedAuditLogger:
     """Enhanced audit logging with Discord channel mirroring and structured events"""
     
-    def __init__(self, bot):
+    def __init__(self, bot, send_queue: Optional[DiscordSendQueue] = None):
         self.bot = bot
         self.audit_channel_id = None
+        # Pass the scheduler's queue so all sends share one global rate limit
+        self._owns_send_queue = send_queue is None
+        self.send_queue = send_queue or DiscordSendQueue(workers=1)
+        # Mirrored events arrive in bursts; batch their embeds up to 10 per message
+        self.audit_embeds = EmbedBatcher(self.send_queue)
         self._load_audit_settings()
     
+    async def stop(self):
+        """Send any batched audit embeds, then stop the send queue if this logger created it"""
+        await self.audit_embeds.stop()
+        if self._owns_send_queue:
+            await self.send_queue.stop()
+    
     def _load_audit_settings(self):
         """Load audit channel settings"""
         try:
@@ -46,7 +107,7 @@ class EnhancedAuditLogger:
                 settings = get_settings(db)
                 # For now, use admin channel as audit channel
                 # Later can be extended to separate audit channel
-                self.audit_channel_id = settings.admin_channel_id
+                self.audit_channel_id = int(settings.admin_channel_id) if settings.admin_channel_id else None
         except Exception as e:
             logger.error(f"Failed to load audit settings: {e}")
     
@@ -105,19 +166,30 @@ class EnhancedAuditLogger:
     async def _process_audit_event(self, event: InteractionEvent):
         """Process and store audit event"""
         try:
-            # Store in database
-            with get_db_session() as db:
-                log_action(
-                    db,
-                    action=event.event_type,
-                    actor_id=event.user_id,
-                    target=event.metadata.get('target', ''),
-                    metadata={
-                        **asdict(event),
-                        'structured_event': True
-                    }
-                )
+            # Shallow copy: asdict() would deep-copy the metadata dict on every event
+            entry = audit_values(
+                action=event.event_type,
+                actor_id=event.user_id,
+                target=event.metadata.get('target', ''),
+                metadata={
+                    **vars(event),
+                    'structured_event': True
+                }
+            )
             
+            # Queue for the background audit writer when it's running, otherwise insert directly
+            writer = getattr(self.bot, 'audit_writer', None)
+            if writer is not None:
+                writer.submit([entry])
+            else:
+                async with get_async_db_session() as db:
+                    await db.execute(insert(AuditLog), [entry])
+                    await db.commit()
+            
+            # The audit channel is read once at startup; pick up changes when settings are saved
+            if event.event_type == 'settings_updated':
+                self._load_audit_settings()
+
             # Mirror to Discord if configured and important
             if self._should_mirror_to_discord(event):
                 await self._mirror_to_discord(event)
@@ -127,26 +199,7 @@ class EnhancedAuditLogger:
     
     def _should_mirror_to_discord(self, event: InteractionEvent) -> bool:
         """Determine if event should be mirrored to Discord"""
-        # Mirror important events to Discord
-        important_events = {
-            'assignment_created',
-            'assignment_escalated', 
-            'break_request_approved',
-            'break_request_denied',
-            'edit_request_approved',
-            'edit_request_denied',
-            'end_early_approved',
-            'end_early_denied',
-            'force_assignment',
-            'settings_updated',
-            'task_template_created',
-            'task_template_deleted',
-            'dashboard_snapshot_created',
-            'system_error',
-            'security_violation'
-        }
-        
-        return event.event_type in important_events
+        return event.event_type in _IMPORTANT_EVENTS
     
     async def _mirror_to_discord(self, event: InteractionEvent):
         """Mirror important events to Discord audit channel"""
@@ -154,37 +207,24 @@ class EnhancedAuditLogger:
             if not self.audit_channel_id:
                 return
             
-            # Find the audit channel
-            audit_channel = None
-            for guild in self.bot.guilds:
-                channel = guild.get_channel(int(self.audit_channel_id))
-                if channel:
-                    audit_channel = channel
-                    break
-            
+            # Channel IDs are global, so the client-wide cache finds it without walking guilds
+            audit_channel = self.bot.get_channel(self.audit_channel_id)
             if not audit_channel:
                 return
             
-            embed = self._create_audit_embed(event)
-            await audit_channel.send(embed=embed)
+            # Started on first use; both calls are no-ops once running
+            self.send_queue.start()
+            self.audit_embeds.start()
+            await self.audit_embeds.add(audit_channel, self._create_audit_embed(event))
             
         except Exception as e:
             logger.error(f"Failed to mirror to Discord: {e}")
     
     def _create_audit_embed(self, event: InteractionEvent) -> discord.Embed:
         """Create audit embed for Discord"""
-        # Color based on event type
-        color = 0x3498db  # Default blue
-        if 'error' in event.event_type or 'violation' in event.event_type:
-            color = 0xff0000  # Red for errors
-        elif 'approved' in event.event_type or 'created' in event.event_type:
-            color = 0x00ff00  # Green for success
-        elif 'denied' in event.event_type or 'escalated' in event.event_type:
-            color = 0xffa500  # Orange for warnings
-        
         embed = discord.Embed(
-            title=f"🔍 Audit: {event.event_type.replace('_', ' ').title()}",
-            color=color,
+            title=_audit_title(event.event_type),
+            color=_EVENT_COLORS.get(event.event_type, 0x3498db),  # Default blue
             timestamp=event.timestamp
         )
         
@@ -224,7 +264,7 @@ class EnhancedAuditLogger:
                     inline=False
                 )
         
-        embed.set_footer(text=f"Event ID: {hash(str(event.timestamp) + event.user_id)}")
+        embed.set_footer(text=f"Event ID: {event.event_id}")
         
         return embed
     
@@ -233,66 +273,71 @@ class EnhancedAuditLogger:
         start_date: datetime,
         end_date: datetime,
         event_types: Optional[List[str]] = None
-    ) -> List[Dict[str, Any]]:
-        """Export audit logs for a date range"""
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream audit logs for a date range, newest first, without loading them all"""
+        stmt = select(
+            AuditLog.id, AuditLog.at, AuditLog.action, AuditLog.actor_id, AuditLog.target, AuditLog.data
+        ).where(
+            AuditLog.at >= start_date,
+            AuditLog.at <= end_date
+        )
+        
+        if event_types:
+            stmt = stmt.where(AuditLog.action.in_(event_types))
+        
+        stmt = stmt.order_by(AuditLog.at.desc()).execution_options(yield_per=1000)
+        
         try:
-            with get_db_session() as db:
-                query = db.query(AuditLog).filter(
-                    AuditLog.timestamp >= start_date,
-                    AuditLog.timestamp <= end_date
-                )
-                
-                if event_types:
-                    query = query.filter(AuditLog.action.in_(event_types))
-                
-                logs = query.order_by(AuditLog.timestamp.desc()).all()
-                
-                export_data = []
-                for log in logs:
-                    export_data.append({
+            async with get_async_db_session() as db:
+                async for log in await db.stream(stmt):
+                    yield {
                         'id': log.id,
-                        'timestamp': log.timestamp.isoformat(),
+                        'timestamp': log.at.isoformat(),
                         'action': log.action,
                         'actor_id': log.actor_id,
                         'target': log.target,
-                        'metadata': log.metadata
-                    })
-                
-                return export_data
-                
+                        'metadata': log.data
+                    }
+                    
         except Exception as e:
+            # Re-raised so a cut-off stream isn't mistaken for a complete export
             logger.error(f"Failed to export audit logs: {e}")
-            return []
+            raise
     
     async def get_user_activity_summary(self, user_id: str, days: int = 7) -> Dict[str, Any]:
         """Get activity summary for a user"""
         try:
             with get_db_session() as db:
                 start_date = datetime.now(timezone.utc) - timedelta(days=days)
+                in_period = (AuditLog.actor_id == user_id, AuditLog.at >= start_date)
                 
-                logs = db.query(AuditLog).filter(
-                    AuditLog.actor_id == user_id,
-                    AuditLog.timestamp >= start_date
-                ).all()
-                
-                # Aggregate activity
-                activity_counts = {}
-                recent_actions = []
+                # Aggregate activity in SQL; only the latest 20 rows are fetched
+                activity_counts = dict(db.execute(
+                    select(AuditLog.action, func.count())
+                    .where(*in_period)
+                    .group_by(AuditLog.action)
+                ).all())
                 
-                for log in logs:
-                    activity_counts[log.action] = activity_counts.get(log.action, 0) + 1
-                    recent_actions.append({
-                        'action': log.action,
-                        'timestamp': log.timestamp.isoformat(),
-                        'target': log.target
-                    })
+                recent_actions = [
+                    {
+                        'action': action,
+                        'timestamp': at.isoformat(),
+                        'target': target
+                    }
+                    for action, at, target in db.execute(
+                        select(AuditLog.action, AuditLog.at, AuditLog.target)
+                        .where(*in_period)
+                        .order_by(AuditLog.at.desc())
+                        .limit(20)
+                    )
+                ]
                 
                 return {
                     'user_id': user_id,
                     'period_days': days,
-                    'total_actions': len(logs),
+                    'total_actions': sum(activity_counts.values()),
                     'activity_breakdown': activity_counts,
-                    'recent_actions': sorted(recent_actions, key=lambda x: x['timestamp'], reverse=True)[:20]
+                    'recent_actions': recent_actions
                 }
                 
         except Exception as e:
@@ -304,10 +349,12 @@ class EnhancedAuditLogger:
 enhanced_audit_logger = None
 
 
-def init_enhanced_audit_logger(bot):
+def init_enhanced_audit_logger(bot, send_queue: Optional[DiscordSendQueue] = None):
     """Initialize the enhanced audit logger"""
     global enhanced_audit_logger
-    enhanced_audit_logger = EnhancedAuditLogger(bot)
+    enhanced_audit_logger = EnhancedAuditLogger(bot, send_queue)
+    # Held on the bot so its shutdown path can flush pending audit embeds
+    bot.enhanced_audit_logger = enhanced_audit_logger
     return enhanced_audit_logger
 
 
@@ -336,21 +383,22 @@ def audit_interaction(event_type: str, include_metadata: bool = True):
     """Decorator to automatically audit command interactions"""
     def decorator(func):
         async def wrapper(*args, **kwargs):
+            # Nothing to do when audit logging isn't initialized
+            if enhanced_audit_logger is None:
+                return await func(*args, **kwargs)
+            
             # Extract interaction from args
-            interaction = None
-            for arg in args:
-                if isinstance(arg, discord.Interaction):
-                    interaction = arg
-                    break
+            interaction = next((arg for arg in args if isinstance(arg, discord.Interaction)), None)
             
-            if interaction and enhanced_audit_logger:
+            if interaction:
                 metadata = {}
-                if include_metadata:
-                    # Extract command parameters
-                    if hasattr(interaction, 'namespace') and interaction.namespace:
-                        for key, value in interaction.namespace.__dict__.items():
-                            if not key.startswith('_'):
-                                metadata[key] = str(value)
+                # Extract command parameters
+                if include_metadata and getattr(interaction, 'namespace', None):
+                    metadata = {
+                        key: str(value)
+                        for key, value in vars(interaction.namespace).items()
+                        if not key.startswith('_')
+                    }
                 
                 await enhanced_audit_logger.log_interaction_event(event_type, interaction, metadata)
             
@@ -0,0 +1,111 @@
+"""
+Background audit writer that batches audit rows into grouped INSERTs.
+
+Opt-in via AUDIT_ASYNC_WRITES=true. Rows are held in memory until the next
+flush; stop() writes out whatever is still queued on shutdown, so only entries
+queued in the last few milliseconds before a crash are lost.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from database import get_async_db_session, get_db_session
+from models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Audit writer configuration
+AUDIT_ASYNC_WRITES = os.getenv('AUDIT_ASYNC_WRITES', 'false').lower() == 'true'
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '256'))
+AUDIT_FLUSH_INTERVAL = int(os.getenv('AUDIT_FLUSH_INTERVAL_MS', '50')) / 1000
+
+
+class AuditWriter:
+    """Queue audit rows and write them in batches from a background task"""
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._batch: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background flusher"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Audit writer started")
+
+    async def stop(self):
+        """Stop the flusher and write every row still queued"""
+        if self._task:
+            # wait_for() can swallow a cancel that races with a row arriving; repeat until one lands
+            while not self._task.done():
+                self._task.cancel()
+                await asyncio.wait({self._task}, timeout=0.1)
+            self._task = None
+
+        # A flush already under way runs to completion rather than being cut off mid-INSERT
+        if self._flushing:
+            await self._flushing
+            self._flushing = None
+
+        rows, self._batch = self._batch, []
+        while not self.queue.empty():
+            rows.append(self.queue.get_nowait())
+        if rows:
+            await self._flush(rows)
+        logger.info("Audit writer stopped")
+
+    def submit(self, entries: List[Dict[str, Any]]):
+        """Queue audit rows (AuditLog column values) for the next flush"""
+        for entry in entries:
+            self.queue.put_nowait(entry)
+
+    async def _run(self):
+        """Collect up to batch_size rows, or whatever arrives within flush_interval, then flush"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Collected on self so stop() still writes a batch interrupted mid-wait
+            self._batch.append(await self.queue.get())
+            deadline = loop.time() + self.flush_interval
+
+            while len(self._batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Shielded so stop() lets an in-flight INSERT finish instead of cancelling it
+            batch, self._batch = self._batch, []
+            self._flushing = asyncio.create_task(self._flush(batch))
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        """Write a batch of audit rows in one executemany INSERT, retrying once on the sync engine"""
+        try:
+            async with get_async_db_session() as db:
+                await db.execute(insert(AuditLog), batch)
+                await db.commit()
+            return
+        except Exception as e:
+            logger.warning(f"Failed to write {len(batch)} audit rows, retrying: {e}")
+
+        try:
+            await asyncio.to_thread(self._flush_sync, batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit rows after retry: {e}")
+
+    def _flush_sync(self, batch: List[Dict[str, Any]]):
+        """Fallback write through a sync session, on the sync engine's own pool"""
+        with get_db_session() as db:
+            db.execute(insert(AuditLog), batch)
+            db.commit()
@@ -2,16 +2,21 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import asyncio
+import atexit
 import os
 import json
+import orjson
 import logging
-from datetime import datetime, time, timedelta, timezone
-import pytz
-from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from dataclasses import dataclass, field
+from functools import lru_cache
+from time import time as epoch_time
 from typing import Optional, Dict, List
 import sys
-import csv
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 # Add the src directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
@@ -22,8 +27,11 @@ from dashboard_core import DashboardManager
 
 # Task assignment system imports
 from database import init_database, check_database_connection, get_db_session
-from models import get_or_create_user, get_settings, Assignment, AssignmentStatus, Shift, log_action
+from models import get_or_create_user, get_settings, Assignment, AssignmentStatus, Shift, log_action, ONE_HOUR, next_hour, utcnow
 from assignment_scheduler import AssignmentScheduler
+from audit_writer import AuditWriter, AUDIT_ASYNC_WRITES
+from audit_enhanced import init_enhanced_audit_logger
+from operator_log import OperatorLogWriter
 
 # Load environment variables
 load_dotenv()
@@ -38,7 +46,7 @@ if missing_vars:
 
 # Discord bot setup
 TOKEN = os.getenv('DISCORD_TOKEN')
-TIMEZONE = pytz.timezone('America/Los_Angeles')
+TIMEZONE = ZoneInfo('America/Los_Angeles')
 
 # Configure logging
 logging.basicConfig(
@@ -55,11 +63,23 @@ logger = logging.getLogger(__name__)
 intents = discord.Intents.default()
 intents.message_content = True  # For reading message content
 intents.members = True  # For accessing member information
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class LakBayBot(commands.Bot):
+    """Bot that stops its background workers before disconnecting"""
+    
+    async def close(self):
+        await shutdown_background_tasks()
+        await super().close()
+
+bot = LakBayBot(command_prefix="!", intents=intents)
 
 # Initialize Equipment Dashboard manager
 equipment_dashboard = EquipmentDashboard()
 
+# Operator action CSV log; rows still queued at exit are written out
+operator_log = OperatorLogWriter()
+atexit.register(operator_log.close)
+
 # Initialize Assignment Scheduler (will be set after bot is ready)
 assignment_scheduler = None
 dashboard_manager = None
@@ -71,151 +91,217 @@ def load_nickname_storage():
     """Load stored nickname data from file"""
     try:
         if os.path.exists(NICKNAME_STORAGE_FILE):
-            with open(NICKNAME_STORAGE_FILE, 'r') as f:
-                return json.load(f)
+            with open(NICKNAME_STORAGE_FILE, 'rb') as f:
+                return orjson.loads(f.read())
         return {}
     except Exception as e:
         logger.error(f"Failed to load nickname storage: {e}")
         return {}
 
-def save_nickname_storage(data):
-    """Save nickname data to file"""
+# One writer thread keeps saves in order, so an older snapshot never lands last;
+# the lock covers synchronous saves made outside the event loop
+_nickname_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nickname-storage")
+_nickname_write_lock = threading.Lock()
+
+def _write_nickname_file(content: bytes):
+    """Write serialized nickname data to a temp file and swap it into place"""
+    tmp_path = NICKNAME_STORAGE_FILE + '.tmp'
     try:
-        with open(NICKNAME_STORAGE_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        with _nickname_write_lock:
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            # Atomic rename: a crash mid-write leaves the previous file intact
+            os.replace(tmp_path, NICKNAME_STORAGE_FILE)
     except Exception as e:
         logger.error(f"Failed to save nickname storage: {e}")
 
+def save_nickname_storage(data):
+    """Save nickname data to file; on the event loop the write happens in a worker thread"""
+    # Serialize here so the thread writes a snapshot while handlers keep mutating `data`
+    content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    try:
+        asyncio.get_running_loop().run_in_executor(_nickname_writer, _write_nickname_file, content)
+    except RuntimeError:
+        _write_nickname_file(content)
+
 # Initialize nickname storage
 nickname_storage = load_nickname_storage()
 
+# Mutations within this window share one rewrite of the storage file
+NICKNAME_SAVE_DELAY = 2.0
+_nickname_save_handle = None
+
+def schedule_nickname_save():
+    """Save nickname storage after NICKNAME_SAVE_DELAY; repeat calls until then are free"""
+    global _nickname_save_handle
+    if _nickname_save_handle is not None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        save_nickname_storage(nickname_storage)
+        return
+    _nickname_save_handle = loop.call_later(NICKNAME_SAVE_DELAY, flush_nickname_storage)
+
+def flush_nickname_storage():
+    """Write any scheduled nickname storage save now"""
+    global _nickname_save_handle
+    if _nickname_save_handle is None:
+        return
+    _nickname_save_handle.cancel()
+    _nickname_save_handle = None
+    save_nickname_storage(nickname_storage)
+
+atexit.register(flush_nickname_storage)
+
+@dataclass
+class TriggerConfig:
+    """Start/stop trigger patterns for one activity role in a channel"""
+    start_pattern: str
+    stop_pattern: str
+    role_name: str
+    nickname_format: str
+    action_log: str
+    duration_minutes: Dict[str, int] = field(default_factory=dict)
+    start_re: re.Pattern = field(init=False)
+    stop_re: re.Pattern = field(init=False)
+    # Placeholder in nickname_format filled from the start match: 'number', 'item', 'break_type' or None
+    placeholder: Optional[str] = field(init=False)
+    
+    def __post_init__(self):
+        # Compile patterns and classify the nickname format once, at import
+        self.start_re = re.compile(self.start_pattern, re.IGNORECASE)
+        self.stop_re = re.compile(self.stop_pattern, re.IGNORECASE)
+        self.placeholder = next(
+            (name for name in ('number', 'item', 'break_type') if name in self.nickname_format),
+            None
+        )
+
 # Channel trigger configurations
 CHANNEL_CONFIGS = {
     'gello-history': [
-        {
-            'start_pattern': r'starting gello (\d+)',
-            'stop_pattern': r'stopping gello (\d+)',
-            'role_name': 'Piloting',
-            'nickname_format': 'Gello {number}',
-            'action_log': 'gello_piloting'
-        },
-        {
-            'start_pattern': r'fixing (.+)',
-            'stop_pattern': r'done',
-            'role_name': 'Fixing',
-            'nickname_format': 'Fixing {item}',
-            'action_log': 'fixing'
-        }
+        TriggerConfig(
+            start_pattern=r'starting gello (\d+)',
+            stop_pattern=r'stopping gello (\d+)',
+            role_name='Piloting',
+            nickname_format='Gello {number}',
+            action_log='gello_piloting'
+        ),
+        TriggerConfig(
+            start_pattern=r'fixing (.+)',
+            stop_pattern=r'done',
+            role_name='Fixing',
+            nickname_format='Fixing {item}',
+            action_log='fixing'
+        )
     ],
     'breaks': [
-        {
-            'start_pattern': r'(break|lunch)',
-            'stop_pattern': r'back',
-            'role_name': 'On Break',
-            'nickname_format': '{break_type}',
-            'duration_minutes': {'break': 10, 'lunch': 60},
-            'action_log': 'break'
-        }
+        TriggerConfig(
+            start_pattern=r'(break|lunch)',
+            stop_pattern=r'back',
+            role_name='On Break',
+            nickname_format='{break_type}',
+            duration_minutes={'break': 10, 'lunch': 60},
+            action_log='break'
+        )
     ],
     'shift-changes': [
-        {
-            'start_pattern': r'starting shift',
-            'stop_pattern': r'stopping shift',
-            'role_name': 'Current Shift',
-            'nickname_format': 'On Shift',
-            'action_log': 'shift_status'
-        }
+        TriggerConfig(
+            start_pattern=r'starting shift',
+            stop_pattern=r'stopping shift',
+            role_name='Current Shift',
+            nickname_format='On Shift',
+            action_log='shift_status'
+        )
     ]
 }
 
+# One combined pattern per channel so messages that trigger nothing are rejected in a
+# single scan; matches still go through the configs in order, which sets precedence
+CHANNEL_TRIGGER_FILTERS = {
+    channel_name: re.compile(
+        '|'.join(
+            f"(?:{pattern})"
+            for config in configs
+            for pattern in (config.start_pattern, config.stop_pattern)
+        ),
+        re.IGNORECASE
+    )
+    for channel_name, configs in CHANNEL_CONFIGS.items()
+}
+
+# Activity tags the bot adds to nicknames, for spotting stuck ones
+ACTIVITY_TAG_PATTERN = re.compile(r'\[(?:Gello|break|lunch|Fixing|On Shift|Current Shift|Piloting)')
+
+# Reactions for trigger messages by role; breaks pick ☕ or 🍽️ by break type
+START_REACTIONS = {'Piloting': '🚀', 'Fixing': '🔧', 'Current Shift': '🎯'}
+STOP_REACTIONS = {'On Break': '✅', 'Current Shift': '👋'}
+
 async def process_channel_triggers(message):
     """Process message triggers for role/nickname management"""
     try:
+        # Only routed here (via CHANNEL_HANDLERS) for channels with CHANNEL_CONFIGS entries
         channel_name = message.channel.name
-        if channel_name not in CHANNEL_CONFIGS:
+        content = message.content.lower().strip()
+        if not CHANNEL_TRIGGER_FILTERS[channel_name].search(content):
             return
         
-        content = message.content.lower().strip()
         user = message.author
         guild = message.guild
         
         for config in CHANNEL_CONFIGS[channel_name]:
             # Check start patterns
-            start_match = re.search(config['start_pattern'], content, re.IGNORECASE)
+            start_match = config.start_re.search(content)
             if start_match:
-                # Initialize result variable
-                result = None
-                nickname_tag = None
-                
                 # Extract parameters from the match
-                if 'number' in config['nickname_format']:
-                    # For Gello operations
-                    number = start_match.group(1)
-                    nickname_tag = config['nickname_format'].replace('{number}', number)
-                    result = await manage_role_and_nickname(
-                        guild, user, 'start', config['role_name'], nickname_tag
-                    )
-                    
-                elif 'item' in config['nickname_format']:
-                    # For fixing operations
-                    item = start_match.group(1)
-                    nickname_tag = config['nickname_format'].replace('{item}', item)
-                    result = await manage_role_and_nickname(
-                        guild, user, 'start', config['role_name'], nickname_tag
-                    )
-                    
-                elif 'break_type' in config['nickname_format']:
+                duration = None
+                if config.placeholder is None:
+                    # Default case
+                    nickname_tag = config.nickname_format
+                elif config.placeholder == 'break_type':
                     # For break operations - simple break tracking without quota checking
-                    break_type = start_match.group(1)
-                    duration = config.get('duration_minutes', {}).get(break_type, 10)
-                    nickname_tag = break_type
-                    
-                    # Use duration for breaks
-                    result = await manage_role_and_nickname(
-                        guild, user, 'start', config['role_name'], 
-                        nickname_tag, duration
-                    )
+                    nickname_tag = start_match.group(1)
+                    duration = config.duration_minutes.get(nickname_tag, 10)
                 else:
-                    # Default case
-                    nickname_tag = config['nickname_format']
-                    result = await manage_role_and_nickname(
-                        guild, user, 'start', config['role_name'], nickname_tag
+                    # Gello number or fixing item
+                    nickname_tag = config.nickname_format.replace(
+                        '{' + config.placeholder + '}', start_match.group(1)
                     )
                 
+                result = await manage_role_and_nickname(
+                    guild, user, 'start', config.role_name, nickname_tag, duration
+                )
+                
                 # Log the action
                 if result and result['success']:
-                    details = nickname_tag if nickname_tag else config['role_name']
+                    details = nickname_tag if nickname_tag else config.role_name
                     log_operator_action(
                         str(user.id),
                         user.display_name,
-                        f"{config['action_log']}_start",
+                        f"{config.action_log}_start",
                         details
                     )
                     
                     # React with appropriate emoji based on action type
-                    if config['role_name'] == 'Piloting':
-                        await message.add_reaction('🚀')
-                    elif config['role_name'] == 'On Break':
+                    if config.role_name == 'On Break':
                         emoji = '☕' if nickname_tag == 'break' else '🍽️'
-                        await message.add_reaction(emoji)
-                    elif config['role_name'] == 'Fixing':
-                        await message.add_reaction('🔧')
-                    elif config['role_name'] == 'Current Shift':
-                        await message.add_reaction('🎯')
                     else:
-                        await message.add_reaction('✅')
+                        emoji = START_REACTIONS.get(config.role_name, '✅')
+                    await message.add_reaction(emoji)
                 elif result:
-                    logger.warning(f"Failed to start {config['role_name']} for {user.display_name}: {result['message']}")
+                    logger.warning(f"Failed to start {config.role_name} for {user.display_name}: {result['message']}")
                 else:
-                    logger.error(f"No result returned for {config['role_name']} operation for {user.display_name}")
+                    logger.error(f"No result returned for {config.role_name} operation for {user.display_name}")
                 
                 return  # Process only first matching pattern
             
             # Check stop patterns
-            stop_match = re.search(config['stop_pattern'], content, re.IGNORECASE)
+            stop_match = config.stop_re.search(content)
             if stop_match:
                 result = await manage_role_and_nickname(
-                    guild, user, 'stop', config['role_name']
+                    guild, user, 'stop', config.role_name
                 )
                 
                 # Log the action
@@ -223,47 +309,55 @@ async def process_channel_triggers(message):
                     log_operator_action(
                         str(user.id),
                         user.display_name,
-                        f"{config['action_log']}_stop",
-                        config['role_name']
+                        f"{config.action_log}_stop",
+                        config.role_name
                     )
                     # React with appropriate stop emoji
-                    if config['role_name'] == 'On Break':
-                        await message.add_reaction('✅')
-                    elif config['role_name'] == 'Current Shift':
-                        await message.add_reaction('👋')
-                    else:
-                        await message.add_reaction('🛑')
+                    await message.add_reaction(STOP_REACTIONS.get(config.role_name, '🛑'))
                 else:
-                    logger.warning(f"Failed to stop {config['role_name']} for {user.display_name}: {result['message']}")
+                    logger.warning(f"Failed to stop {config.role_name} for {user.display_name}: {result['message']}")
                 
                 return  # Process only first matching pattern
                 
     except Exception as e:
         logger.error(f"Error processing channel triggers: {e}")
 
+# Role IDs by guild and role name, so repeat lookups skip the scan over guild.roles
+_role_id_cache: Dict[int, Dict[str, int]] = {}
+
+def get_role_by_name(guild, role_name: str) -> Optional[discord.Role]:
+    """Find a guild role by name, remembering its ID for next time"""
+    names = _role_id_cache.setdefault(guild.id, {})
+    role_id = names.get(role_name)
+    role = guild.get_role(role_id) if role_id else None
+    
+    # Rescan if the cached role was deleted or renamed since
+    if role is None or role.name != role_name:
+        role = discord.utils.get(guild.roles, name=role_name)
+        if role:
+            names[role_name] = role.id
+        else:
+            names.pop(role_name, None)
+    
+    return role
+
 # Role checking helper functions
+ADMIN_OR_MANAGER = frozenset({"Admin", "Manager"})
+
 def has_required_role(interaction, required_roles):
     """Check if user has any of the required roles"""
-    user_roles = [role.name for role in interaction.user.roles]
-    return any(role in user_roles for role in required_roles)
+    return not {role.name for role in interaction.user.roles}.isdisjoint(required_roles)
+
+@lru_cache(maxsize=1)
+def _log_timestamp(epoch_second: int) -> str:
+    """Local timestamp for operator log rows; formatted once per wall-clock second"""
+    return datetime.fromtimestamp(epoch_second, TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
 
 def log_operator_action(discord_id: str, username: str, action: str, details: str = ""):
     """Log operator actions to CSV file"""
     try:
-        log_file = "operator_logs.csv"
-        timestamp = datetime.now(TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Create file with headers if it doesn't exist
-        if not os.path.exists(log_file):
-            with open(log_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Timestamp", "Discord_ID", "Username", "Action", "Details"])
-        
-        # Append the log entry
-        with open(log_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([timestamp, discord_id, username, action, details])
-            
+        timestamp = _log_timestamp(int(epoch_time()))
+        operator_log.submit([timestamp, discord_id, username, action, details])
         logger.info(f"Logged action: {username} - {action}")
         
     except Exception as e:
@@ -382,7 +476,7 @@ async def manage_role_and_nickname(guild, user, action_type, role_name, nickname
                 }
             
             # Find the role
-            role = discord.utils.get(guild.roles, name=role_name)
+            role = get_role_by_name(guild, role_name)
             if not role:
                 try:
                     # Create the role if it doesn't exist
@@ -448,10 +542,10 @@ async def manage_role_and_nickname(guild, user, action_type, role_name, nickname
                 except Exception as e:
                     logger.error(f"Failed to update nickname for {user.display_name}: {e}")
                     # Role was added successfully, so this is partial success
-                    save_nickname_storage(nickname_storage)
+                    schedule_nickname_save()
                     return {"success": True, "message": f"Role added but nickname update failed"}
             
-            save_nickname_storage(nickname_storage)
+            schedule_nickname_save()
             return {"success": True, "message": f"Successfully started {role_name} with tag [{nickname_tag}]"}
             
         elif action_type == 'stop':
@@ -462,7 +556,7 @@ async def manage_role_and_nickname(guild, user, action_type, role_name, nickname
             stored_info = nickname_storage[user_key]
             
             # Remove role
-            role = discord.utils.get(guild.roles, name=role_name)
+            role = get_role_by_name(guild, role_name)
             if role and role in user.roles:
                 try:
                     await user.remove_roles(role)
@@ -482,20 +576,20 @@ async def manage_role_and_nickname(guild, user, action_type, role_name, nickname
                     
                     # Clean up storage completely
                     del nickname_storage[user_key]
-                    save_nickname_storage(nickname_storage)
+                    schedule_nickname_save()
                     logger.info(f"Restored original nickname for {user.display_name}: {original_nick}")
                     
                 else:
                     # Other roles still active, rebuild nickname based on remaining roles
                     success = await rebuild_nickname_from_active_roles(guild, user, user_key)
                     if success:
-                        save_nickname_storage(nickname_storage)
+                        schedule_nickname_save()
                         logger.info(f"Rebuilt nickname for {user.display_name} with remaining roles: {stored_info['roles']}")
                     else:
                         # Fallback: just clear current tag info
                         if 'current_tag' in stored_info:
                             del stored_info['current_tag']
-                        save_nickname_storage(nickname_storage)
+                        schedule_nickname_save()
                         logger.warning(f"Failed to rebuild nickname for {user.display_name}, cleared current tag")
                     
             except Exception as e:
@@ -523,6 +617,14 @@ async def on_ready():
         else:
             logger.info("Database initialized successfully")
     
+    # Append operator log rows in batches from here on
+    operator_log.start()
+    
+    # Start the batched audit writer if enabled
+    if AUDIT_ASYNC_WRITES and getattr(bot, 'audit_writer', None) is None:
+        bot.audit_writer = AuditWriter()
+        bot.audit_writer.start()
+    
     # Initialize assignment scheduler
     global assignment_scheduler
     try:
@@ -532,6 +634,10 @@ async def on_ready():
     except Exception as e:
         logger.error(f"Failed to start assignment scheduler: {e}")
     
+    # Structured audit events; mirrored embeds share the scheduler's send queue and rate limit
+    if getattr(bot, 'enhanced_audit_logger', None) is None:
+        init_enhanced_audit_logger(bot, assignment_scheduler.send_queue if assignment_scheduler else None)
+    
     # Initialize live dashboard manager
     try:
         global dashboard_manager
@@ -585,6 +691,28 @@ async def on_ready():
     except Exception as e:
         logger.error(f"Failed to initialize equipment dashboard: {e}")
 
+async def shutdown_background_tasks():
+    """Stop the scheduler and audit writers, flushing whatever they still hold"""
+    # Before the scheduler, whose send queue the audit embeds may share
+    audit_logger = getattr(bot, 'enhanced_audit_logger', None)
+    if audit_logger:
+        try:
+            await audit_logger.stop()
+        except Exception as e:
+            logger.error(f"Failed to stop enhanced audit logger: {e}")
+    
+    if assignment_scheduler:
+        try:
+            await assignment_scheduler.stop()
+        except Exception as e:
+            logger.error(f"Failed to stop assignment scheduler: {e}")
+    
+    writer = getattr(bot, 'audit_writer', None)
+    if writer:
+        # Audit rows logged from here on are written directly
+        bot.audit_writer = None
+        await writer.stop()
+
 @bot.event
 async def on_message(message):
     """Handle incoming messages"""
@@ -594,16 +722,12 @@ async def on_message(message):
     # Process commands first
     await bot.process_commands(message)
 
-    # Handle equipment updates in #equipment-updates channel
-    if message.channel.name == 'equipment-updates':
-        await equipment_dashboard.handle_equipment_update(message)
-
-    # Process role/nickname triggers for configured channels
-    await process_channel_triggers(message)
-
-    # Handle shift-changes channel (legacy system)
-    if message.channel.name == 'shift-changes':
-        await handle_shift_changes(message)
+    # Run the handlers registered for this channel, if any; DMs have no channel name
+    handlers = CHANNEL_HANDLERS.get(getattr(message.channel, 'name', None))
+    if not handlers:
+        return
+    for handler in handlers:
+        await handler(message)
 
 async def handle_shift_changes(message):
     """Handle start/stop keywords in shift-changes channel"""
@@ -654,6 +778,14 @@ async def handle_shift_changes(message):
     except Exception as e:
         logger.error(f"Error in handle_shift_changes: {e}")
 
+# Message handlers per channel name, run in order by on_message
+CHANNEL_HANDLERS = {
+    'equipment-updates': [equipment_dashboard.handle_equipment_update],
+    'gello-history': [process_channel_triggers],  # Role/nickname triggers
+    'breaks': [process_channel_triggers],
+    'shift-changes': [process_channel_triggers, handle_shift_changes],  # Plus the legacy system
+}
+
 
 # Equipment dashboard command
 @bot.tree.command(name="dashboard", description="[Admin/Manager] Create or refresh the equipment status dashboard")
@@ -661,7 +793,7 @@ async def dashboard_command(interaction: discord.Interaction):
     """Create or refresh the equipment dashboard (Admin/Manager only)"""
     
     # Check role permissions
-    if not has_required_role(interaction, ["Admin", "Manager"]):
+    if not has_required_role(interaction, ADMIN_OR_MANAGER):
         await interaction.response.send_message(
             "❌ This command is restricted to Admin and Manager roles only.",
             ephemeral=True
@@ -715,7 +847,7 @@ async def dashboard_command(interaction: discord.Interaction):
 async def live_dashboard_command(interaction: discord.Interaction):
     """Create or refresh the live assignment dashboard (Admin/Manager only)"""
     # Check role permissions
-    if not has_required_role(interaction, ["Admin", "Manager"]) and not interaction.user.guild_permissions.manage_guild:
+    if not has_required_role(interaction, ADMIN_OR_MANAGER) and not interaction.user.guild_permissions.manage_guild:
         await interaction.response.send_message(
             "❌ This command is restricted to Admin and Manager roles only.",
             ephemeral=True
@@ -745,7 +877,7 @@ async def cleanup_nicknames_command(interaction: discord.Interaction):
     """Clean up all stuck nicknames and activity roles (Admin/Manager only)"""
     
     # Check role permissions
-    if not has_required_role(interaction, ["Admin", "Manager"]):
+    if not has_required_role(interaction, ADMIN_OR_MANAGER):
         await interaction.response.send_message(
             "❌ This command is restricted to Admin and Manager roles only.",
             ephemeral=True
@@ -763,6 +895,12 @@ async def cleanup_nicknames_command(interaction: discord.Interaction):
         # Activity role names to check for
         activity_role_names = ['On Break', 'Piloting', 'Fixing', 'Current Shift', 'On Shift']  # Include legacy 'On Shift'
         
+        # Resolve the roles once rather than per member
+        activity_roles = [
+            role for role in (get_role_by_name(interaction.guild, name) for name in activity_role_names)
+            if role
+        ]
+        
         # Clean up all members
         for member in interaction.guild.members:
             if member.bot:
@@ -771,15 +909,11 @@ async def cleanup_nicknames_command(interaction: discord.Interaction):
             user_key = f"{interaction.guild.id}_{member.id}"
             member_updated = False
             
-            # Check for activity roles
-            member_activity_roles = []
-            for role_name in activity_role_names:
-                role = discord.utils.get(interaction.guild.roles, name=role_name)
-                if role and role in member.roles:
-                    member_activity_roles.append(role)
+            # Check for activity roles; get_role() checks the member's role IDs without building member.roles
+            member_activity_roles = [role for role in activity_roles if member.get_role(role.id)]
             
             # Check for activity tags in nickname
-            has_activity_tag = any(tag in member.display_name for tag in ['[Gello', '[break', '[lunch', '[Fixing', '[On Shift', '[Current Shift', '[Piloting'])
+            has_activity_tag = ACTIVITY_TAG_PATTERN.search(member.display_name) is not None
             
             # If they have activity roles or tags but no stored data, or stored data is inconsistent
             if member_activity_roles or has_activity_tag:
@@ -826,7 +960,7 @@ async def cleanup_nicknames_command(interaction: discord.Interaction):
         
         # Save updated nickname storage
         if cleanup_count > 0:
-            save_nickname_storage(nickname_storage)
+            schedule_nickname_save()
         
         await interaction.followup.send(
             f"✅ **Cleanup Complete!**\n" +
@@ -928,7 +1062,7 @@ async def settings_command(
             if timezone:
                 # Validate timezone
                 try:
-                    pytz.timezone(timezone)
+                    ZoneInfo(timezone)
                     settings.timezone = timezone
                     changes.append(f"Timezone: {timezone}")
                 except:
@@ -994,6 +1128,8 @@ async def settings_command(
             
             # Save changes
             db.commit()
+            if assignment_scheduler:
+                assignment_scheduler.invalidate_settings_cache()
             
             # Log the configuration change
             from models import log_action
@@ -1045,7 +1181,7 @@ async def task_command(
     """Manage task templates (Admin only)"""
     
     # Check admin permissions
-    if not has_required_role(interaction, ["Admin", "Manager"]) and not interaction.user.guild_permissions.manage_guild:
+    if not has_required_role(interaction, ADMIN_OR_MANAGER) and not interaction.user.guild_permissions.manage_guild:
         await interaction.response.send_message(
             "❌ You need Admin/Manager role or Manage Guild permission to manage tasks.",
             ephemeral=True
@@ -1191,13 +1327,11 @@ async def attempt_immediate_task_assignment(db, scheduler: AssignmentScheduler,
     - Start now; end at top of hour (or next hour if >= :40).
     """
     try:
-        now_utc = datetime.now(timezone.utc)
+        now_utc = utcnow()
         # Determine end time per rules
-        minute = now_utc.minute
-        if minute >= 40:
-            end_boundary = (now_utc.replace(minute=0, second=0, microsecond=0) + timedelta(hours=2))
-        else:
-            end_boundary = (now_utc.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+        end_boundary = next_hour(now_utc)
+        if now_utc.minute >= 40:
+            end_boundary += ONE_HOUR
 
         # Find all active Data Labelling assignments
         from models import Assignment, AssignmentStatus
@@ -1214,7 +1348,7 @@ async def attempt_immediate_task_assignment(db, scheduler: AssignmentScheduler,
             a.task_name = task_name
             a.started_at = now_utc
             a.ends_at = end_boundary
-            a.template_id = None
+            a.template = None
             a.params = {}
             a.covering_for_user_id = None
             a.forced = True
@@ -1377,7 +1511,7 @@ async def force_assign_command(
     """Force assign a task to a user (Admin only)"""
     
     # Check admin permissions
-    if not has_required_role(interaction, ["Admin", "Manager"]) and not interaction.user.guild_permissions.manage_guild:
+    if not has_required_role(interaction, ADMIN_OR_MANAGER) and not interaction.user.guild_permissions.manage_guild:
         await interaction.response.send_message(
             "❌ You need Admin/Manager role or Manage Guild permission to force assign tasks.",
             ephemeral=True
@@ -1408,10 +1542,9 @@ async def force_assign_command(
             
             if not active_shift:
                 # Create a shift for the user (assuming they're starting now)
-                from datetime import datetime, timezone
                 active_shift = Shift(
                     user_id=str(user.id),
-                    start_at=datetime.now(timezone.utc),
+                    start_at=utcnow(),
                     tz_base=settings.timezone
                 )
                 db.add(active_shift)
@@ -1422,7 +1555,7 @@ async def force_assign_command(
                 hour_index = assignment_scheduler.calculate_hour_index(active_shift.start_at)
             else:
                 # Fallback calculation
-                elapsed = datetime.now(timezone.utc) - active_shift.start_at
+                elapsed = utcnow() - active_shift.start_at
                 hour_index = max(1, min(9, int(elapsed.total_seconds() // 3600) + 1))
             
             # Parse parameters
@@ -1454,8 +1587,7 @@ async def force_assign_command(
                 action_type = "updated"
             else:
                 # Create new assignment
-                now_utc = datetime.now(timezone.utc)
-                ends_at = now_utc.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+                ends_at = next_hour(utcnow())
                 
                 new_assignment = Assignment(
                     user_id=str(user.id),
@@ -1494,7 +1626,7 @@ async def force_assign_command(
             # Send assignment widget to user's thread
             if assignment_scheduler:
                 try:
-                    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+                    assignment = db.get(Assignment, assignment_id)
                     await assignment_scheduler.post_assignment_widget(assignment)
                 except Exception as e:
                     logger.error(f"Failed to post force-assigned widget: {e}")
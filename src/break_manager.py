@@ -50,7 +50,7 @@ class BreakManager:
         try:
             with get_db_session() as db:
                 # Get assignment and validate
-                assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+                assignment = db.get(Assignment, assignment_id)
                 if not assignment:
                     return False, "Assignment not found"
                 
@@ -234,7 +234,7 @@ class BreakManager:
     async def _start_break(self, db, assignment_id: int, user_id: str, break_payload: dict) -> bool:
         """Start a break by updating assignment status and setting up coverage"""
         try:
-            assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+            assignment = db.get(Assignment, assignment_id)
             if not assignment or assignment.status not in [AssignmentStatus.ACTIVE, AssignmentStatus.COVERING]:
                 return False
             
@@ -346,7 +346,7 @@ class BreakManager:
         """Resume assignment after break ends"""
         try:
             with get_db_session() as db:
-                assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+                assignment = db.get(Assignment, assignment_id)
                 if not assignment:
                     return
                 
@@ -361,7 +361,7 @@ class BreakManager:
                 if coverage_assignment:
                     # Return coverage operator to Data Labelling
                     with get_db_session() as db2:
-                        current_coverage = db2.query(Assignment).filter(Assignment.id == coverage_assignment.id).first()
+                        current_coverage = db2.get(Assignment, coverage_assignment.id)
                         if current_coverage and current_coverage.status == AssignmentStatus.COVERING:
                             current_coverage.task_name = "Data Labelling"
                             current_coverage.template_id = None
@@ -404,11 +404,8 @@ class BreakManager:
                     return
                 
                 # Find guild and admin channel
-                guild = None
-                for g in self.bot.guilds:
-                    if g.get_member(int(assignment.user_id)):
-                        guild = g
-                        break
+                member_id = int(assignment.user_id)
+                guild = next((g for g in self.bot.guilds if g.get_member(member_id)), None)
                 
                 if not guild:
                     return
@@ -476,7 +473,7 @@ class BreakManager:
                 
                 for request in queued_requests:
                     # Check if staffing now allows this break
-                    assignment = db.query(Assignment).filter(Assignment.id == request.assignment_id).first()
+                    assignment = db.get(Assignment, request.assignment_id)
                     if not assignment or assignment.status not in [AssignmentStatus.ACTIVE, AssignmentStatus.COVERING]:
                         # Assignment no longer active, remove from queue
                         request.status = ApprovalStatus.DENIED
@@ -3,10 +3,13 @@ Database connection and migration management.
 """
 import os
 import logging
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Generator
 
-from sqlalchemy import create_engine, text
+import orjson
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
@@ -17,6 +20,22 @@ logger = logging.getLogger(__name__)
 # Database configuration
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///lakbay_assignments.db')
 
+# Connection pool sizing (PostgreSQL only)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '20'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+
+
+def _json_serializer(value: Any) -> str:
+    """Encode JSON columns with orjson; datetimes serialize natively as ISO 8601"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Applied to every engine so JSON columns skip the stdlib encoder
+JSON_OPTIONS = {
+    'json_serializer': _json_serializer,
+    'json_deserializer': orjson.loads,
+}
+
 # Create engine with appropriate settings
 if DATABASE_URL.startswith('sqlite'):
     # SQLite settings for development
@@ -27,19 +46,58 @@ if DATABASE_URL.startswith('sqlite'):
             'check_same_thread': False,
             'timeout': 20
         },
-        echo=False  # Set to True for SQL debugging
+        echo=False,  # Set to True for SQL debugging
+        **JSON_OPTIONS
     )
 else:
     # PostgreSQL settings for production
     engine = create_engine(
         DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
         pool_pre_ping=True,
-        pool_recycle=300,
-        echo=False
+        pool_recycle=1800,
+        echo=False,
+        **JSON_OPTIONS
     )
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Schema changes run outside a transaction so PostgreSQL can build indexes CONCURRENTLY
+ddl_engine = engine.execution_options(isolation_level='AUTOCOMMIT')
+
+# Session factory; objects stay readable after commit so callers don't re-query
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# asyncio drivers for the same database, used by code running on the Discord event loop
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+_url = make_url(DATABASE_URL)
+ASYNC_DATABASE_URL = os.getenv(
+    'ASYNC_DATABASE_URL',
+    _url.set(drivername=ASYNC_DRIVERS[_url.get_backend_name()]).render_as_string(hide_password=False)
+)
+
+if DATABASE_URL.startswith('sqlite'):
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={'timeout': 20},
+        echo=False,
+        **JSON_OPTIONS
+    )
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        echo=False,
+        **JSON_OPTIONS
+    )
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 @contextmanager
@@ -55,13 +113,70 @@ def get_db_session() -> Generator[Session, None, None]:
         db.close()
 
 
+# Columns added after their table first shipped; create_all() won't add them to existing tables
+SCHEMA_COLUMN_UPGRADES = [
+    ("assignments", "version", "INTEGER NOT NULL DEFAULT 0"),
+    ("assignments", "widget_message_id", "VARCHAR"),
+]
+
+# Indexes that no query uses any more; dropped from databases that already built them
+SCHEMA_RETIRED_INDEXES = [
+    "idx_assignment_status_created",
+]
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get asyncio database session with automatic cleanup"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def apply_schema_upgrades():
+    """Add any missing columns and indexes to tables that already exist"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    for table, column, ddl in SCHEMA_COLUMN_UPGRADES:
+        if table not in existing_tables:
+            continue
+        
+        columns = {c['name'] for c in inspector.get_columns(table)}
+        if column in columns:
+            continue
+        
+        logger.info(f"Adding column {table}.{column}")
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    
+    for index_name in SCHEMA_RETIRED_INDEXES:
+        try:
+            with ddl_engine.connect() as conn:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        except Exception as e:
+            logger.warning(f"Failed to drop index {index_name}: {e}")
+    
+    # create_all() only builds indexes alongside new tables
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=ddl_engine, checkfirst=True)
+            except Exception as e:
+                logger.warning(f"Failed to create index {index.name}: {e}")
+
+
 def init_database():
     """Initialize database tables"""
     try:
         logger.info("Initializing database...")
         
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=ddl_engine)
+        apply_schema_upgrades()
         
         logger.info("Database initialized successfully")
         return True
@@ -105,7 +220,8 @@ def migrate_database():
                 logger.info("Fresh database detected, creating schema...")
                 
             # Create/update all tables (idempotent)
-            Base.metadata.create_all(bind=engine)
+            Base.metadata.create_all(bind=ddl_engine)
+            apply_schema_upgrades()
             
             logger.info("Database migrations completed successfully")
             return True
@@ -124,7 +240,7 @@ def reset_database():
         Base.metadata.drop_all(bind=engine)
         
         # Recreate all tables
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=ddl_engine)
         
         logger.info("Database reset completed")
         return True
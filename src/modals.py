@@ -174,7 +174,7 @@ class EditTaskModal(discord.ui.Modal):
                     return
                 
                 # Get assignment details
-                assignment = db.query(Assignment).filter(Assignment.id == self.assignment_id).first()
+                assignment = db.get(Assignment, self.assignment_id)
                 if not assignment:
                     return
                 
@@ -348,7 +348,7 @@ class EndEarlyModal(discord.ui.Modal):
                 if not settings.admin_channel_id:
                     return
                 
-                assignment = db.query(Assignment).filter(Assignment.id == self.assignment_id).first()
+                assignment = db.get(Assignment, self.assignment_id)
                 if not assignment:
                     return
                 
@@ -440,7 +440,7 @@ class EditApprovalView(discord.ui.View):
                 
                 if approved:
                     # Apply the changes to the assignment
-                    assignment = db.query(Assignment).filter(Assignment.id == self.assignment_id).first()
+                    assignment = db.get(Assignment, self.assignment_id)
                     if assignment and request.payload.get("proposed_changes"):
                         # Update assignment parameters
                         current_params = assignment.params or {}
@@ -546,7 +546,7 @@ class EndEarlyApprovalView(discord.ui.View):
                 
                 if approved:
                     # End the assignment early
-                    assignment = db.query(Assignment).filter(Assignment.id == self.assignment_id).first()
+                    assignment = db.get(Assignment, self.assignment_id)
                     if assignment:
                         assignment.status = AssignmentStatus.ENDED_EARLY
                         assignment.ended_at = datetime.now(timezone.utc)
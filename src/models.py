@@ -3,15 +3,17 @@ SQLAlchemy models for the task assignment system.
 All timestamps are stored in UTC.
 """
 import enum
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from sqlalchemy import (
     Column, Integer, String, DateTime, Boolean, Text, JSON, 
-    ForeignKey, Enum, Index, UniqueConstraint
+    ForeignKey, Enum, Index, UniqueConstraint, text
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import FunctionElement
 
 Base = declarative_base()
 
@@ -90,6 +92,13 @@ class Shift(Base):
     __table_args__ = (
         Index("idx_shift_user_active", "user_id", "end_at"),
         Index("idx_shift_timerange", "start_at", "end_at"),
+        # Open shifts by start time, for the scheduler's on-shift operator lookup
+        Index(
+            "idx_shift_open_start", "start_at",
+            postgresql_where=text("end_at IS NULL"),
+            postgresql_concurrently=True,
+            sqlite_where=text("end_at IS NULL")
+        ),
     )
     
     def __repr__(self):
@@ -141,6 +150,8 @@ class Assignment(Base):
     ended_at = Column(DateTime(timezone=True), nullable=True)    # Actual end time
     covering_for_user_id = Column(String, ForeignKey("users.id"), nullable=True)  # If covering for someone on break
     forced = Column(Boolean, default=False, nullable=False)      # True if force-assigned
+    version = Column(Integer, nullable=False, default=0)         # Optimistic-locking counter
+    widget_message_id = Column(String, nullable=True)            # Discord message holding the widget
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
@@ -156,14 +167,37 @@ class Assignment(Base):
         Index("idx_assignment_user_shift", "user_id", "shift_id"),
         Index("idx_assignment_status", "status"),
         Index("idx_assignment_hour", "hour_index"),
+        # Reassignment candidate search: same hour, task and status
+        Index("idx_assignment_hour_task_status", "hour_index", "task_name", "status"),
         Index("idx_assignment_covering", "covering_for_user_id"),
+        # Partial indexes stay small as completed history grows; they serve the
+        # status-guarded transitions in assignment_operations
+        Index(
+            "idx_assignment_pending_ack", "id",
+            postgresql_where=text("status = 'PENDING_ACK'"),
+            postgresql_concurrently=True,
+            sqlite_where=text("status = 'PENDING_ACK'")
+        ),
+        Index(
+            "idx_assignment_active_user", "user_id", "id",
+            postgresql_where=text("status IN ('ACTIVE', 'COVERING')"),
+            postgresql_concurrently=True,
+            sqlite_where=text("status IN ('ACTIVE', 'COVERING')")
+        ),
         UniqueConstraint("user_id", "shift_id", "hour_index", name="uq_user_shift_hour"),
     )
     
+    # Flushes verify and bump the version so concurrent transitions can't silently overwrite each other
+    __mapper_args__ = {"version_id_col": version}
+    
     def __repr__(self):
         return f"<Assignment(id={self.id}, user_id={self.user_id}, task_name={self.task_name}, status={self.status.value})>"
 
 
+# Predicate of the partial unique index on pending approvals; also the ON CONFLICT target
+PENDING_APPROVAL_WHERE = "status = 'PENDING'"
+
+
 class ApprovalRequest(Base):
     """Requests requiring admin approval"""
     __tablename__ = "approval_requests"
@@ -189,6 +223,13 @@ class ApprovalRequest(Base):
         Index("idx_approval_status", "status"),
         Index("idx_approval_user_assignment", "user_id", "assignment_id"),
         Index("idx_approval_requested_at", "requested_at"),
+        # At most one pending request of each type per assignment
+        Index(
+            "ux_approval_pending", "assignment_id", "type",
+            unique=True,
+            postgresql_where=text(PENDING_APPROVAL_WHERE),
+            sqlite_where=text(PENDING_APPROVAL_WHERE)
+        ),
     )
     
     def __repr__(self):
@@ -231,6 +272,7 @@ class AuditLog(Base):
         Index("idx_audit_at", "at"),
         Index("idx_audit_actor", "actor_id"),
         Index("idx_audit_action", "action"),
+        Index("idx_audit_actor_at", "actor_id", "at"),
     )
     
     def __repr__(self):
@@ -249,6 +291,46 @@ class DashState(Base):
         return f"<DashState(dashboard_message_id={self.dashboard_message_id})>"
 
 
+ONE_HOUR = timedelta(hours=1)
+
+
+def utcnow() -> datetime:
+    """Current time as an aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+
+def next_hour(dt: datetime) -> datetime:
+    """Start of the hour following dt"""
+    return dt.replace(minute=0, second=0, microsecond=0) + ONE_HOUR
+
+
+# Widgets show at most this many characters of a template's instructions
+INSTRUCTIONS_PREVIEW_LENGTH = 200
+
+
+def instructions_preview(instructions: str) -> str:
+    """Instructions cut to INSTRUCTIONS_PREVIEW_LENGTH, with an ellipsis if anything was cut"""
+    if len(instructions) > INSTRUCTIONS_PREVIEW_LENGTH:
+        return instructions[:INSTRUCTIONS_PREVIEW_LENGTH] + "..."
+    return instructions
+
+
+class next_hour_boundary(FunctionElement):
+    """Start of the next whole hour according to the database clock"""
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(next_hour_boundary)
+def _compile_next_hour_boundary(element, compiler, **kw):
+    return "date_trunc('hour', now()) + interval '1 hour'"
+
+
+@compiles(next_hour_boundary, "sqlite")
+def _compile_next_hour_boundary_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:00:00', 'now', '+1 hour')"
+
+
 # Helper functions for database operations
 def get_or_create_user(db: Session, user_id: str, display_name: str, is_operator: bool = False, is_admin: bool = False) -> User:
     """Get existing user or create new one"""
@@ -291,13 +373,22 @@ def get_settings(db: Session) -> Settings:
     return settings
 
 
+def audit_values(action: str, actor_id: Optional[str] = None, target: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Column values for an audit log row, for bulk or deferred inserts"""
+    return {
+        "actor_id": actor_id,
+        "action": action,
+        "target": target,
+        "data": metadata or {}
+    }
+
+
+def build_audit(action: str, actor_id: Optional[str] = None, target: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> AuditLog:
+    """Build an audit log entry without adding it to a session"""
+    return AuditLog(**audit_values(action, actor_id, target, metadata))
+
+
 def log_action(db: Session, action: str, actor_id: Optional[str] = None, target: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
     """Create audit log entry"""
-    log_entry = AuditLog(
-        actor_id=actor_id,
-        action=action,
-        target=target,
-        data=metadata or {}
-    )
-    db.add(log_entry)
+    db.add(build_audit(action, actor_id, target, metadata))
     db.commit()
@@ -0,0 +1,78 @@
+"""
+Buffered writer for the operator action CSV log.
+
+Rows are queued and appended by a background task every couple of seconds,
+keeping one file handle open instead of opening the file for every action.
+The appends run in a worker thread so disk latency never stalls the event loop.
+"""
+import asyncio
+import csv
+import logging
+import os
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+OPERATOR_LOG_FILE = "operator_logs.csv"
+OPERATOR_LOG_HEADER = ["Timestamp", "Discord_ID", "Username", "Action", "Details"]
+
+
+class OperatorLogWriter:
+    """Queue operator log rows and append them in batches from a background task"""
+
+    def __init__(self, path: str = OPERATOR_LOG_FILE, flush_interval: float = 2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._batch: List[List[str]] = []
+        self._file = None
+        self._writer = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background flusher"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, row: List[str]):
+        """Queue a row for the next flush; written immediately if the flusher isn't running"""
+        if self._task is None:
+            self._write([row])
+            return
+        self.queue.put_nowait(row)
+
+    def close(self):
+        """Write whatever is still queued and close the file"""
+        rows, self._batch = self._batch, []
+        while not self.queue.empty():
+            rows.append(self.queue.get_nowait())
+        if rows:
+            self._write(rows)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, rows: List[List[str]]):
+        """Append rows, opening the file (and writing the header if it's new) on first use"""
+        try:
+            if self._file is None:
+                is_new = not os.path.exists(self.path)
+                self._file = open(self.path, 'a', newline='')
+                self._writer = csv.writer(self._file)
+                if is_new:
+                    self._writer.writerow(OPERATOR_LOG_HEADER)
+            self._writer.writerows(rows)
+            self._file.flush()
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} operator log rows: {e}")
+
+    async def _run(self):
+        """Flush `flush_interval` seconds after the first row of each burst arrives"""
+        while True:
+            # Held on self so close() still writes a batch interrupted mid-wait
+            self._batch.append(await self.queue.get())
+            await asyncio.sleep(self.flush_interval)
+            while not self.queue.empty():
+                self._batch.append(self.queue.get_nowait())
+            rows, self._batch = self._batch, []
+            await asyncio.to_thread(self._write, rows)
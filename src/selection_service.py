@@ -11,6 +11,9 @@ from models import User, TaskTemplate, Assignment, AssignmentStatus
 
 logger = logging.getLogger(__name__)
 
+# Sort key for operators who have never been Comms Lead
+NEVER_LEAD = datetime.min.replace(tzinfo=timezone.utc)
+
 
 @dataclass
 class TaskCandidate:
@@ -40,18 +43,13 @@ class SelectionService:
         if len(operators) == 1:
             return operators[0]
             
-        # Sort by last_comms_lead_at (None values first = never been Comms Lead)
-        # Then by user ID for consistent tie-breaking
-        sorted_operators = sorted(
+        # Least recent last_comms_lead_at wins (None = never been Comms Lead)
+        # Then by user ID for consistent tie-breaking; min() is one pass, no sort
+        selected = min(
             operators,
-            key=lambda u: (
-                u.last_comms_lead_at or datetime.min.replace(tzinfo=timezone.utc),
-                u.id
-            )
+            key=lambda u: (u.last_comms_lead_at or NEVER_LEAD, u.id)
         )
         
-        selected = sorted_operators[0]
-        
         logger.info(
             f"Selected Comms Lead: {selected.display_name} "
             f"(last served: {selected.last_comms_lead_at or 'never'})"
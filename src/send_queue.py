@@ -0,0 +1,207 @@
+"""
+Rate-limited queue for outgoing Discord messages.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Steady-state send rates kept under Discord's limits
+GLOBAL_RATE = (45, 1.0)       # 45 requests per second across the bot
+CHANNEL_RATE = (5, 5.0)       # 5 messages per 5 seconds per channel
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_EMBEDS_PER_MESSAGE = 10   # Discord's per-message embed limit
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per `per` seconds"""
+
+    def __init__(self, rate: int, per: float):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self.updated is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+class DiscordSendQueue:
+    """Funnel message sends through worker tasks that respect global and per-channel rates"""
+
+    def __init__(self, workers: int = 4):
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.global_bucket = TokenBucket(*GLOBAL_RATE)
+        self.channel_buckets: Dict[int, TokenBucket] = {}
+        self._tasks = []
+
+    def start(self):
+        """Start the worker tasks"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Discord send queue started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 5.0):
+        """Give queued sends up to `timeout` seconds to go out, then cancel the workers and fail the rest"""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Discord send queue stopping with {self.queue.qsize()} messages unsent")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Nothing will deliver these now; resolve them so callers of send() don't wait forever
+        while not self.queue.empty():
+            _, _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Send queue stopped before the message was sent"))
+            self.queue.task_done()
+
+    async def send(self, target: discord.abc.Messageable, **kwargs: Any) -> Optional[discord.Message]:
+        """
+        Queue a message and wait for it to be delivered.
+
+        Args:
+            target: Channel or thread to send to
+            **kwargs: Arguments for target.send()
+
+        Returns:
+            The sent message; raises whatever target.send() raised
+        """
+        if not self._tasks:
+            # Not started (e.g. scheduler failed to start); send directly rather than hang
+            return await target.send(**kwargs)
+
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((target, kwargs, future))
+        return await future
+
+    def _channel_bucket(self, target) -> TokenBucket:
+        """Per-channel bucket, created on first use"""
+        bucket = self.channel_buckets.get(target.id)
+        if bucket is None:
+            bucket = self.channel_buckets[target.id] = TokenBucket(*CHANNEL_RATE)
+        return bucket
+
+    async def _worker(self):
+        """Deliver queued messages one at a time"""
+        while True:
+            target, kwargs, future = await self.queue.get()
+            try:
+                message = await self._deliver(target, kwargs)
+                if not future.done():
+                    future.set_result(message)
+            except asyncio.CancelledError:
+                # Stopped mid-delivery; fail the send instead of leaving its caller hanging
+                if not future.done():
+                    future.set_exception(RuntimeError("Send queue stopped before the message was sent"))
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, target, kwargs: Dict[str, Any]) -> discord.Message:
+        """Send once tokens are available, sleeping out any Retry-After from Discord"""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await self._channel_bucket(target).acquire()
+            await self.global_bucket.acquire()
+
+            try:
+                return await target.send(**kwargs)
+            except discord.RateLimited as e:
+                retry_after = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    raise
+                retry_after = float(e.response.headers.get('Retry-After', 1))
+
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                raise RuntimeError(f"Gave up sending to channel {target.id} after repeated rate limits")
+
+            logger.warning(f"Rate limited sending to channel {target.id}; retrying in {retry_after:.1f}s")
+            await asyncio.sleep(retry_after)
+
+
+class EmbedBatcher:
+    """Collect embeds bound for the same channel and post them together, up to 10 per message"""
+
+    def __init__(self, send_queue: DiscordSendQueue, interval: float = 0.5):
+        self.send_queue = send_queue
+        self.interval = interval
+        self.pending: Dict[int, Tuple[discord.abc.Messageable, List[discord.Embed]]] = {}
+        self._has_pending = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background flusher"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and send whatever is still pending"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        # A flush already under way has taken its embeds out of `pending`; let it finish sending them
+        if self._flushing:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+            self._flushing = None
+        await self.flush()
+
+    async def add(self, target: discord.abc.Messageable, embed: discord.Embed):
+        """Queue an embed for the next flush; sent immediately if the flusher isn't running"""
+        if self._task is None:
+            await self.send_queue.send(target, embed=embed)
+            return
+
+        self.pending.setdefault(target.id, (target, []))[1].append(embed)
+        self._has_pending.set()
+
+    async def _run(self):
+        """Flush `interval` seconds after the first embed of each burst arrives"""
+        while True:
+            await self._has_pending.wait()
+            await asyncio.sleep(self.interval)
+            self._has_pending.clear()
+            # Shielded so stop() lets an in-flight flush finish instead of dropping its embeds
+            self._flushing = asyncio.create_task(self.flush())
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    async def flush(self):
+        """Send every pending embed, grouped by channel"""
+        pending, self.pending = self.pending, {}
+        for target, embeds in pending.values():
+            for i in range(0, len(embeds), MAX_EMBEDS_PER_MESSAGE):
+                try:
+                    await self.send_queue.send(target, embeds=embeds[i:i + MAX_EMBEDS_PER_MESSAGE])
+                except Exception as e:
+                    logger.error(f"Failed to send {len(embeds[i:i + MAX_EMBEDS_PER_MESSAGE])} batched embeds to channel {target.id}: {e}")
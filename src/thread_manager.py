@@ -3,7 +3,8 @@ Thread management for operator assignment system.
 Handles creation and management of private threads for each operator.
 """
 import logging
-from typing import Optional, Dict, List
+from collections import OrderedDict
+from typing import Optional, List, Tuple
 import discord
 from datetime import datetime, timedelta
 
@@ -12,14 +13,18 @@ from models import get_settings, get_or_create_user
 
 logger = logging.getLogger(__name__)
 
+# Operator threads remembered per (guild_id, user_id), least recently used evicted first
+THREAD_CACHE_SIZE = 1024
+
 
 class ThreadManager:
     """Manages private threads for operators"""
     
     def __init__(self, bot: discord.Client):
         self.bot = bot
-        # Cache of thread objects by user_id for performance
-        self._thread_cache: Dict[str, discord.Thread] = {}
+        # LRU of thread IDs by (guild_id, user_id); IDs are resolved through discord.py's
+        # local thread cache, so hits cost no HTTP requests
+        self._thread_cache: OrderedDict[Tuple[int, str], int] = OrderedDict()
         
     async def get_or_create_operator_thread(
         self, 
@@ -39,17 +44,10 @@ class ThreadManager:
             Thread object or None if failed
         """
         try:
-            # Check cache first
-            if user_id in self._thread_cache:
-                thread = self._thread_cache[user_id]
-                try:
-                    # Verify thread still exists and is accessible by fetching message history head
-                    async for _ in thread.history(limit=1):
-                        pass
-                    return thread
-                except (discord.NotFound, discord.Forbidden, AttributeError):
-                    # Thread was deleted or inaccessible, remove from cache
-                    del self._thread_cache[user_id]
+            # Check cache first; archived or deleted threads drop out of guild.get_thread
+            thread = self._get_cached_thread(guild, user_id)
+            if thread:
+                return thread
             
             # Get settings to find the assignments channel
             with get_db_session() as db:
@@ -74,13 +72,13 @@ class ThreadManager:
             # Look for existing thread for this user
             existing_thread = await self._find_existing_thread(assignments_channel, user_id, display_name)
             if existing_thread:
-                self._thread_cache[user_id] = existing_thread
+                self._cache_thread(guild, user_id, existing_thread)
                 return existing_thread
             
             # Create new private thread
             thread = await self._create_operator_thread(assignments_channel, user_id, display_name, settings)
             if thread:
-                self._thread_cache[user_id] = thread
+                self._cache_thread(guild, user_id, thread)
                 return thread
                 
             return None
@@ -89,6 +87,42 @@ class ThreadManager:
             logger.error(f"Failed to get/create thread for user {user_id}: {e}")
             return None
             
+    def _get_cached_thread(self, guild: discord.Guild, user_id: str) -> Optional[discord.Thread]:
+        """Resolve a cached thread ID to a live thread, dropping it if discord.py no longer has it"""
+        key = (guild.id, user_id)
+        thread_id = self._thread_cache.get(key)
+        if thread_id is None:
+            return None
+        
+        thread = guild.get_thread(thread_id)
+        if thread is None or thread.archived:
+            del self._thread_cache[key]
+            return None
+        
+        self._thread_cache.move_to_end(key)
+        return thread
+        
+    def _cache_thread(self, guild: discord.Guild, user_id: str, thread: discord.Thread):
+        """Remember a user's thread, evicting the least recently used entry when full"""
+        self._thread_cache[(guild.id, user_id)] = thread.id
+        self._thread_cache.move_to_end((guild.id, user_id))
+        if len(self._thread_cache) > THREAD_CACHE_SIZE:
+            self._thread_cache.popitem(last=False)
+            
+    def _forget_thread(self, thread_id: int):
+        """Drop cache entries pointing at a thread"""
+        for key in [key for key, cached_id in self._thread_cache.items() if cached_id == thread_id]:
+            del self._thread_cache[key]
+            
+    async def on_thread_update(self, before: discord.Thread, after: discord.Thread):
+        """Forget threads once they are archived"""
+        if after.archived:
+            self._forget_thread(after.id)
+            
+    async def on_thread_delete(self, thread: discord.Thread):
+        """Forget deleted threads"""
+        self._forget_thread(thread.id)
+        
     async def _find_existing_thread(
         self,
         channel: discord.TextChannel,
@@ -335,6 +369,7 @@ class ThreadManager:
     def clear_cache(self, user_id: Optional[str] = None):
         """Clear thread cache for user or all users"""
         if user_id:
-            self._thread_cache.pop(user_id, None)
+            for key in [key for key in self._thread_cache if key[1] == user_id]:
+                del self._thread_cache[key]
         else:
             self._thread_cache.clear()
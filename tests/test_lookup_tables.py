@@ -0,0 +1,22 @@
+"""
+Lookup tables keyed on enum members or event names must cover every key they're read with.
+"""
+from src.assignment_operations import _STATUS_DISPLAY
+from src.models import AssignmentStatus
+from audit_enhanced import _EVENT_COLORS, _IMPORTANT_EVENTS
+
+
+def test_status_display_covers_every_assignment_status():
+    for status in AssignmentStatus:
+        assert status in _STATUS_DISPLAY, f"{status} has no display name"
+
+
+def test_status_display_uses_spaces():
+    for status, display in _STATUS_DISPLAY.items():
+        assert display == status.value.replace('_', ' ')
+
+
+def test_every_colored_event_is_mirrored():
+    # Colors are only read for mirrored events; a colored event missing here is never shown
+    for event_type in _EVENT_COLORS:
+        assert event_type in _IMPORTANT_EVENTS, f"{event_type} has a color but is never mirrored"